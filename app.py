@@ -1,15 +1,27 @@
-import json
 import streamlit as st
 import pandas as pd
 from processing.prazos import dias_para_encerrar
 from processing.financeiro import consolidar_empenhos
 from datetime import datetime
 from processing.utils import formatar
+from processing.moeda import parse_valor, parse_valor_serie
 from processing.calculo_exercicio import calcular_valor_exercicio
-from processing.visao_contratos import montar_tabela_contratos
+from processing.visao_contratos_vetorizada import montar_tabelas_exercicios
+from processing.base_local import (
+    carregar_base_ugs,
+    carregar_indice_empenhos,
+    carregar_modelos,
+    faturas_locais,
+    ugs_disponiveis,
+)
+from processing.base_processada import carregar_base_processada
+from processing.riscos import classificar_riscos
+from processing.registro import obter_registro
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
 from services.contratos import ContratosService
 from services.api_client import APIClient
+from services.cache_http import CacheHTTP
+from services.transporte import ErroAPI, Transporte
 import plotly.express as px
 
 
@@ -91,45 +103,79 @@ with st.sidebar:
 
 
     st.markdown("---")
-    st.caption("Sistema Gerencial Institucional")
 
-# ================= CARREGAMENTO =================
+    # base particionada por UG; sem partições, usa a base legada única
+    ugs_base = ugs_disponiveis()
+    ugs_selecionadas = []
 
-with open("data/raw/contratos.json", encoding="utf-8") as f:
-    contratos = json.load(f)
-
-with open("data/raw/empenhos.json", encoding="utf-8") as f:
-    empenhos_base = json.load(f)
+    if ugs_base:
+        ugs_selecionadas = st.multiselect(
+            "Unidades gestoras",
+            ugs_base,
+            default=ugs_base
+        )
+        st.markdown("---")
 
-with open("data/raw/historicos.json", encoding="utf-8") as f:
-    historicos = json.load(f)
+    st.caption("Sistema Gerencial Institucional")
 
+if ugs_base and not ugs_selecionadas:
+    st.info("Selecione ao menos uma unidade gestora.")
+    st.stop()
 
+# ================= CARREGAMENTO =================
 
+# lida uma vez por processo (só as UGs selecionadas);
+# recarrega sozinha quando o coletor regrava os arquivos.
+# empenhos e históricos ficam indexados em disco: cada contrato só é
+# decodificado quando usado (montagem da tabela, modal do contrato)
+contratos, empenhos_base, historicos, versao_base = carregar_base_ugs(
+    ugs_selecionadas,
+    preguicoso=True
+)
+registro_contratos = obter_registro(contratos, versao_base)
 
+# somas de empenhos por contrato × ano (gravadas pelo coletor)
+indice_empenhos = carregar_indice_empenhos(ugs_selecionadas)
 
 
+# tabelas prontas do coletor (data/processed) se forem desta versão da
+# base; senão, todos os exercícios numa passada — o ano de referência
+# já sai ajustado pelo anterior. Prazos sempre relativos a `hoje`;
+# colunas de risco (status, ano/mês/trimestre do vencimento) já vêm
+# calculadas: as páginas só filtram e agrupam.
 @st.cache_data(show_spinner=False)
-def carregar_df_base_anterior():
-    return montar_tabela_contratos(
-        contratos,
-        historicos,
-        empenhos_base,
-        ano_referencia-1
-    )
+def carregar_tabelas_exercicios(versao_base, ugs, anos, hoje):
+    tabelas = carregar_base_processada(ugs, versao_base, anos, hoje)
+
+    if tabelas is None:
+        # valores e datas convertidos uma vez por versão (da tabela
+        # Parquet tipada do coletor, se atual); o modal segue lendo os
+        # dicts brutos
+        historicos_modelos = carregar_modelos(
+            contratos, historicos, versao_base, list(ugs)
+        )
 
-df_base_anterior = carregar_df_base_anterior()
+        tabelas = montar_tabelas_exercicios(
+            contratos,
+            historicos_modelos,
+            indice_empenhos,
+            anos,
+            hoje
+        )
 
+    return {
+        ano: classificar_riscos(df, hoje)
+        for ano, df in tabelas.items()
+    }
 
-@st.cache_data(show_spinner=False)
-def carregar_df_base():
-    return montar_tabela_contratos(
-        contratos,
-        historicos,
-        empenhos_base,
-        ano_referencia,df_base_anterior
-    )
-df_base = carregar_df_base()
+tabelas_exercicios = carregar_tabelas_exercicios(
+    versao_base,
+    tuple(ugs_selecionadas),
+    (ano_referencia - 1, ano_referencia),
+    datetime.now().date()
+)
+df_base_anterior = tabelas_exercicios[ano_referencia - 1]
+df_base = tabelas_exercicios[ano_referencia]
 
 # ================= KPIs =================
 df = df_base.copy()
@@ -697,20 +743,9 @@ if pagina == "⚠️ Riscos e Continuidade":
 
     st.markdown("### 📅 Distribuição de Vencimentos por Mês")
 
-    df_vigencia = df.copy()
-
-    df_vigencia["Vigência fim"] = pd.to_datetime(
-        df_vigencia["Vigência fim"],
-        errors="coerce"
-    )
-
-    df_vigencia = df_vigencia[df_vigencia["Vigência fim"].notnull()]
-
-    df_vigencia["Ano"] = df_vigencia["Vigência fim"].dt.year
-    df_vigencia["Mês"] = df_vigencia["Vigência fim"].dt.month
-
-    # opcional: apenas contratos ainda vigentes
-    df_vigencia = df_vigencia[df_vigencia["Dias para encerrar"] >= 0]
+    # Ano/Mês/Trimestre do vencimento já vêm na base (classificar_riscos);
+    # apenas contratos ainda vigentes e com data de fim
+    df_vigencia = df[df["Ano"].notna() & (df["Dias para encerrar"] >= 0)]
 
     df_mes = (
         df_vigencia
@@ -749,16 +784,8 @@ if pagina == "⚠️ Riscos e Continuidade":
 
     st.markdown("### 📊 Linha do Tempo – Vencimentos por Trimestre")
 
-    df_trimestre = df_vigencia.copy()
-
-    df_trimestre["Trimestre"] = (
-        "T" + df_trimestre["Vigência fim"].dt.quarter.astype(str)
-    )
-
-    df_trimestre["Ano"] = df_trimestre["Vigência fim"].dt.year
-
     df_tri = (
-        df_trimestre
+        df_vigencia
         .groupby(["Ano", "Trimestre"])
         .size()
         .reset_index(name="Quantidade")
@@ -908,13 +935,38 @@ def obter_historico_local(contrato_id, historicos):
     return df
 
 
+MODO_OFFLINE = False  # True: faturas apenas do cache local, sem rede
+
+
+@st.cache_resource
+def obter_cache_http():
+    """
+    Cache HTTP persistente, único por processo.
+    """
+    return CacheHTTP(offline=MODO_OFFLINE)
+
+
+@st.cache_resource
+def obter_transporte_app():
+    """
+    Transporte do painel: o usuário está esperando, então uma única
+    retentativa e Retry-After de até 5 s (o do coletor insiste por minutos).
+    """
+    return Transporte(tentativas=1, espera_max=5.0)
+
+
 def obter_faturas_contrato_api(contrato_obj):
     """
     contrato_obj: objeto do contrato vindo do contratos.json
     Retorna DataFrame com faturas
     """
 
-    client = APIClient("https://contratos.comprasnet.gov.br/api")
+    client = APIClient(
+        "https://contratos.comprasnet.gov.br/api",
+        timeout=15,
+        transporte=obter_transporte_app(),
+        cache=obter_cache_http()
+    )
     service = ContratosService(client)
 
     link = contrato_obj["links"]["faturas"]
@@ -930,14 +982,12 @@ def obter_faturas_contrato_api(contrato_obj):
 
 
 @st.cache_data(show_spinner=False, ttl=3600)
-def carregar_faturas_contrato_cache(contrato_id, contratos):
+def carregar_faturas_contrato_cache(contrato_numero, versao, _registro):
     """
-    Cache por contrato
+    Cache por contrato. A chave é (número, versão da base); o registro
+    (prefixo _) não entra no hash do Streamlit.
     """
-    contrato_obj = next(
-        (c for c in contratos if c["numero"] == contrato_id),
-        None
-    )
+    contrato_obj = _registro.por_numero(contrato_numero)
 
     if not contrato_obj:
         return pd.DataFrame()
@@ -961,39 +1011,6 @@ def formatar_data(valor):
         return "—"
 
 
-def moeda_para_float(valor):
-    """
-    Converte string monetária brasileira para float.
-    Ex: '73.895,79' -> 73895.79
-    """
-    if valor is None:
-        return 0.0
-
-    if isinstance(valor, (int, float)):
-        return float(valor)
-
-    return float(
-        valor.replace(".", "").replace(",", ".")
-    )
-
-
-def obter_empenhos_contrato(contrato_id, empenhos_base):
-    registros = empenhos_base.get(str(contrato_id), [])
-
-    if not registros:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(registros)
-
-    for col in [
-        "empenhado", "aliquidar", "liquidado", "pago",
-        "rpinscrito", "rpaliquidado", "rppago"
-    ]:
-        if col in df.columns:
-            df[col] = df[col].apply(moeda_para_float)
-
-    return df
-
 def card_empenho(e):
     with st.container(border=True):
 
@@ -1015,10 +1032,10 @@ def card_empenho(e):
         # =====================================================
         # 💰 FINANCEIRO — LINHA 1
         # =====================================================
-        empenhado = moeda_para_float(e.get("empenhado", 0))
-        liquidado = moeda_para_float(e.get("liquidado", 0))
-        pago = moeda_para_float(e.get("pago", 0))
-        aliquidar = moeda_para_float(e.get("aliquidar", 0))
+        empenhado = parse_valor(e.get("empenhado", 0))
+        liquidado = parse_valor(e.get("liquidado", 0))
+        pago = parse_valor(e.get("pago", 0))
+        aliquidar = parse_valor(e.get("aliquidar", 0))
 
         col1, col2 = st.columns(2)
         with col1:
@@ -1032,10 +1049,10 @@ def card_empenho(e):
             # =====================================================
             # 💰 RESTOS A PAGAR — SEMPRE VISÍVEL (SE EXISTIR)
             # =====================================================
-            rp_inscrito = moeda_para_float(e.get("rpinscrito", 0))
-            rp_aliquidar = moeda_para_float(e.get("rpaliquidar", 0))
-            rp_liquidado = moeda_para_float(e.get("rpliquidado", 0))
-            rp_pago = moeda_para_float(e.get("rppago", 0))
+            rp_inscrito = parse_valor(e.get("rpinscrito", 0))
+            rp_aliquidar = parse_valor(e.get("rpaliquidar", 0))
+            rp_liquidado = parse_valor(e.get("rpliquidado", 0))
+            rp_pago = parse_valor(e.get("rppago", 0))
 
             if rp_inscrito > 0 or rp_pago > 0:
                 st.markdown(f"""**RP Inscrito:** {formatar(rp_inscrito)}""")
@@ -1080,11 +1097,6 @@ def fmt_data(data):
     return pd.to_datetime(data).strftime("%d/%m/%Y")
 
 
-def to_float(valor):
-    if not valor:
-        return 0.0
-    return float(valor.replace(".", "").replace(",", "."))
-
 def badge(texto, cor="#e5e7eb", texto_cor="#111827"):
     return f"""
     <span style="
@@ -1230,29 +1242,19 @@ if pagina == "📄 Carteira Detalhada":
             # =====================================================
             # 🔹 EMPENHOS FILTRADOS
             # =====================================================
-            df_empenhos = obter_empenhos_contrato(
-                contrato_row["ID"],
-                empenhos_base
-            )
-
-            df_empenhos["ano"] = pd.to_datetime(
-                df_empenhos["data_emissao"],
-                errors="coerce"
-            ).dt.year
-
-            # fallback: ano pela própria NE (ex: 2019NE800152)
-            df_empenhos["ano"] = df_empenhos["ano"].fillna(
-                df_empenhos["numero"].str[:4].astype("float")
-            )
+            # anos e posições das NEs vêm do índice (ano da emissão ou,
+            # sem data, o da própria NE — ex: 2019NE800152); só as NEs
+            # exibidas são lidas da base bruta
+            resumo_empenhos = indice_empenhos.get(str(contrato_row["ID"])) or {}
 
             # =====================================================
             # 🔹 CONTEXTO TEMPORAL
             # =====================================================
             st.markdown("### 🗓️ Exercício")
 
-            anos_disponiveis = sorted(
-                df_empenhos["ano"].dropna().unique().astype(int)
-            )
+            anos_disponiveis = [
+                a for a, t in resumo_empenhos.items() if t.posicoes
+            ]
 
             anos_selecionados = st.multiselect(
                 "Exercício",
@@ -1260,8 +1262,17 @@ if pagina == "📄 Carteira Detalhada":
                 default=[ano_referencia] if ano_referencia in anos_disponiveis else anos_disponiveis
             )
 
+            registros = empenhos_base.get(str(contrato_row["ID"]), [])
+
             if anos_selecionados:
-                df_empenhos = df_empenhos[df_empenhos["ano"].isin(anos_selecionados)]
+                posicoes = sorted(
+                    i
+                    for a in anos_selecionados
+                    for i in resumo_empenhos[a].posicoes
+                )
+                empenhos_exibidos = [registros[i] for i in posicoes]
+            else:
+                empenhos_exibidos = registros
 
             
             # =====================================================
@@ -1318,15 +1329,15 @@ if pagina == "📄 Carteira Detalhada":
 
             st.markdown("### 📄 Notas de empenho")
 
-            if df_empenhos.empty:
+            if not empenhos_exibidos:
                 st.info("Nenhuma nota de empenho encontrada para o período selecionado.")
             else:
                 # Cards em grid (2 por linha)
                 cols = st.columns(2)
 
-                for i, (_, row) in enumerate(df_empenhos.iterrows()):
+                for i, e in enumerate(empenhos_exibidos):
                     with cols[i % 2]:
-                        card_empenho(row)
+                        card_empenho(e)
 
 
 
@@ -1339,11 +1350,23 @@ if pagina == "📄 Carteira Detalhada":
             
             st.markdown("### 📄 Faturas do contrato")
 
-            with st.spinner("Buscando faturas..."):
-                df_faturas = carregar_faturas_contrato_cache(
-                    contrato_row["Contrato"],
-                    contratos
-                )
+            # pré-coletadas pelo coletor; API só se ausentes ou vencidas
+            faturas = faturas_locais(contrato_row["ID"], ugs=ugs_selecionadas)
+
+            if faturas is not None:
+                df_faturas = pd.DataFrame(faturas)
+            else:
+                # falha não entra no cache: a próxima abertura tenta de novo
+                try:
+                    with st.spinner("Buscando faturas..."):
+                        df_faturas = carregar_faturas_contrato_cache(
+                            contrato_row["Contrato"],
+                            registro_contratos.versao,
+                            registro_contratos
+                        )
+                except ErroAPI as e:
+                    st.warning(f"Não foi possível buscar as faturas agora: {e}")
+                    st.stop()
 
             if df_faturas.empty:
                 st.info("Nenhuma fatura encontrada para este contrato.")
@@ -1352,11 +1375,11 @@ if pagina == "📄 Carteira Detalhada":
             # ==============================
             # NORMALIZAÇÃO
             # ==============================
-            df_faturas["valor_float"] = df_faturas["valor"].apply(to_float)
-            df_faturas["valor_liquido_float"] = df_faturas["valorliquido"].apply(to_float)
-            df_faturas["juros_float"] = df_faturas["juros"].apply(to_float)
-            df_faturas["multa_float"] = df_faturas["multa"].apply(to_float)
-            df_faturas["glosa_float"] = df_faturas["glosa"].apply(to_float)
+            df_faturas["valor_float"] = parse_valor_serie(df_faturas["valor"])
+            df_faturas["valor_liquido_float"] = parse_valor_serie(df_faturas["valorliquido"])
+            df_faturas["juros_float"] = parse_valor_serie(df_faturas["juros"])
+            df_faturas["multa_float"] = parse_valor_serie(df_faturas["multa"])
+            df_faturas["glosa_float"] = parse_valor_serie(df_faturas["glosa"])
 
             df_faturas["ano"] = pd.to_datetime(df_faturas["emissao"], errors="coerce").dt.year
             df_faturas["mes"] = pd.to_datetime(df_faturas["emissao"], errors="coerce").dt.month
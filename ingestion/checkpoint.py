@@ -0,0 +1,133 @@
+import json
+import os
+from datetime import datetime
+
+
+CAMINHO_JORNAL = "data/meta/coleta_jornal.jsonl"
+
+
+class JornalColeta:
+    """
+    Diário append-only da coleta: uma linha JSON por contrato concluído.
+
+        {"id": "4388", "coletado_em": "...", "dados": {"historico": [...], ...}}
+
+    Se a coleta for interrompida, a próxima execução lê o diário e
+    retoma a partir dos contratos que ainda não foram concluídos.
+    O arquivo é removido ao final de uma coleta bem-sucedida.
+    """
+
+    def __init__(self, caminho=CAMINHO_JORNAL):
+        self.caminho = caminho
+        self._arquivo = None
+
+    def carregar(self):
+        """
+        Retorna {id: registro} dos contratos já concluídos.
+        Uma última linha truncada (queda no meio da escrita) é ignorada.
+        """
+        concluidos = {}
+
+        if not os.path.exists(self.caminho):
+            return concluidos
+
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    break
+                concluidos[registro["id"]] = registro
+
+        return concluidos
+
+    def registrar(self, cid, dados, agora=None):
+        agora = agora or datetime.now()
+
+        if self._arquivo is None:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+        registro = {
+            "id": str(cid),
+            "coletado_em": agora.isoformat(timespec="seconds"),
+            "dados": dados,
+        }
+
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def encerrar(self):
+        """
+        Coleta concluída: descarta o diário.
+        """
+        self.fechar()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+def salvar_json(caminho, obj):
+    """
+    Grava JSON de forma atômica (arquivo temporário + rename), para que
+    uma queda durante a escrita não corrompa a base anterior.
+    """
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+    tmp = f"{caminho}.tmp"
+
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+    os.replace(tmp, caminho)
+
+
+class EscritaOrdenada:
+    """
+    Recebe os contratos na ordem em que a coleta conclui e os repassa ao
+    EscritorBase na ordem da lista `ids` — a mesma saída da coleta
+    sequencial. Só ficam retidos os que chegaram adiantados.
+
+    Contratos fora de `pendentes` não passam pela coleta: são lidos de
+    `reaproveitar(cid)` (base anterior / diário) na hora da escrita.
+    """
+
+    def __init__(self, escritor, ids, pendentes, reaproveitar):
+        self.escritor = escritor
+        self._ids = list(dict.fromkeys(str(cid) for cid in ids))
+        self._pendentes = set(pendentes)
+        self._reaproveitar = reaproveitar
+        self._adiantados = {}
+        self._pos = 0
+        self._avancar()
+
+    def entregar(self, cid, dados):
+        self._adiantados[str(cid)] = dados
+        self._avancar()
+
+    def _avancar(self):
+        while self._pos < len(self._ids):
+            cid = self._ids[self._pos]
+
+            if cid in self._adiantados:
+                dados = self._adiantados.pop(cid)
+            elif cid not in self._pendentes:
+                dados = self._reaproveitar(cid)
+            else:
+                return
+
+            self.escritor.escrever(cid, dados)
+            self._pos += 1
+
+    def concluir(self):
+        if self._pos < len(self._ids):
+            faltando = self._ids[self._pos]
+            raise RuntimeError(f"Coleta incompleta: contrato {faltando} não entregue")
+        self.escritor.fechar()
@@ -0,0 +1,89 @@
+import asyncio
+
+from ingestion.recursos import ROTULOS
+
+
+async def _coletar_recurso(cid, recurso, url, service):
+    """
+    Retorna (dados, ok). Em caso de falha devolve lista vazia e ok=False.
+    """
+    if not url:
+        return [], True
+
+    try:
+        return await service.obter_link(url), True
+    except Exception as e:
+        rotulo = ROTULOS.get(recurso, recurso.capitalize())
+        print(f"⚠️ {rotulo} erro ({cid}): {e}")
+        return [], False
+
+
+async def coletar_links_async(
+    contratos,
+    service,
+    recursos=("historico", "empenhos"),
+    ao_concluir=None,
+    acumular=True
+):
+    """
+    Busca em paralelo os `links` indicados de cada contrato (qualquer
+    subconjunto de ingestion.recursos.ARQUIVOS_RECURSOS).
+
+    `service` é um ContratosServiceAsync: concorrência, limite de taxa e
+    pool de conexões ficam no cliente assíncrono, compartilhados por
+    todos os recursos de todos os contratos.
+
+    Retorna {recurso: {id_contrato: dados}}, com as chaves na mesma
+    ordem da lista de contratos (saída idêntica à coleta sequencial).
+    Falhas viram lista vazia, como na coleta original.
+
+    ao_concluir(contrato, {recurso: dados}, {recurso: ok}) é chamado
+    assim que todos os links de um contrato terminam; ok=False no recurso
+    que falhou (os dados dele vêm vazios e não devem substituir a cópia
+    local).
+
+    Com acumular=False nada é retido (o retorno vem vazio): cada contrato
+    só existe em memória até ao_concluir gravá-lo.
+    """
+
+    async def coletar_contrato(c):
+        cid = str(c["id"])
+        links = c.get("links", {})
+        print(f"🔄 Contrato {cid}")
+
+        respostas = await asyncio.gather(*[
+            _coletar_recurso(cid, recurso, links.get(recurso), service)
+            for recurso in recursos
+        ])
+
+        dados = [d for d, _ in respostas]
+
+        if ao_concluir:
+            ao_concluir(
+                c,
+                dict(zip(recursos, dados)),
+                {recurso: ok for recurso, (_, ok) in zip(recursos, respostas)}
+            )
+
+        return cid, dados if acumular else None
+
+    resultados = await asyncio.gather(
+        *[coletar_contrato(c) for c in contratos]
+    )
+
+    saida = {recurso: {} for recurso in recursos}
+
+    for cid, dados in resultados:
+        if dados is None:
+            continue
+        for recurso, valor in zip(recursos, dados):
+            saida[recurso][cid] = valor
+
+    return saida
+
+
+def coletar_links(contratos, service, **kwargs):
+    """
+    Atalho síncrono para `coletar_links_async`.
+    """
+    return asyncio.run(coletar_links_async(contratos, service, **kwargs))
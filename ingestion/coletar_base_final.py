@@ -1,76 +1,314 @@
-import json
+import asyncio
 import os
-import time
-from services.api_client import APIClient
-from services.contratos import ContratosService
+from datetime import datetime, timedelta
+from functools import partial
+from services.api_client_async import APIClientAsync
+from services.cache_http import CAMINHO_CACHE_COLETA, TTL_PADRAO, CacheHTTP
+from services.contratos_async import ContratosServiceAsync
+from services.limitador import LimitadorTaxa
+from services.transporte import Transporte
+from ingestion.coleta_async import coletar_links_async
+from ingestion.manifesto import CAMINHO_MANIFESTO, ManifestoColeta
+from ingestion.checkpoint import CAMINHO_JORNAL, EscritaOrdenada, JornalColeta, salvar_json
+from ingestion.exportar_parquet import exportar_diretorio
+from ingestion.recursos import arquivos_recursos
+from processing.base_local import DIR_META, dir_ug, ugs_disponiveis
+from processing.base_processada import gerar_base_processada
+from processing.base_indexada import BaseIndexada
+from processing.serializacao import EscritorBase, caminho_formato, localizar_base
+from processing.tabelas import DIR_PARQUET
 
 # ================= CONFIGURAÇÕES =================
 
-UG = "290002"
+# unidades gestoras monitoradas — coletadas juntas, cada uma gravada
+# na sua partição (data/raw/ug=<UG>, data/meta/ug=<UG>, data/parquet/ug=<UG>)
+UGS = [
+    "290002",
+]
 BASE_URL = "https://contratos.comprasnet.gov.br/api"
-DELAY = 1.5            # respeita a API
-LIMITE_TESTE = 50      # None para produção
+REQ_POR_SEGUNDO = 4    # limite global (token bucket) — respeita a API
+RAJADA = 4             # requisições liberadas de uma vez
+CONCORRENCIA = 8       # requisições simultâneas
+TENTATIVAS = 4         # retentativas em 429/5xx/erros de rede
+MODO_OFFLINE = False   # True remonta a base só com o cache HTTP local
+LIMITE_TESTE = 50      # por UG; None para produção
+
+MODO_INCREMENTAL = True   # False força a recoleta completa
+TTL_DIAS = 7              # recoleta contratos sem mudança após N dias
+
+# links de cada contrato a coletar — qualquer subconjunto de
+# ingestion.recursos.ARQUIVOS_RECURSOS (o histórico entra sempre).
+# Cada um vira data/raw/<recurso>.json e uma tabela Parquet própria.
+RECURSOS_COLETA = (
+    "historico",
+    "empenhos",
+    "faturas",
+    "cronograma",
+    "itens",
+)
+
+RECURSOS = tuple(arquivos_recursos(RECURSOS_COLETA))
+
+# renovados em toda execução, também nos contratos reaproveitados: fatura
+# nova não muda o item da lista e só apareceria após o TTL. O cache HTTP
+# revalida com ETag/Last-Modified, então a maioria volta 304, sem corpo
+RECURSOS_SEMPRE = ("faturas",)
+
+SEMPRE = tuple(r for r in RECURSOS_SEMPRE if r in RECURSOS)
+
+# gravação contrato a contrato, à medida que a coleta conclui:
+# "json" (formato lido pelo painel) ou "jsonl"; compressão None, "gzip"
+# ou "zstd" (requer o pacote zstandard)
+FORMATO_BASE = "json"
+COMPRESSAO = None
 
 # ================= SETUP =================
 
-os.makedirs("data/raw", exist_ok=True)
+transporte = Transporte(tamanho_pool=CONCORRENCIA, tentativas=TENTATIVAS)
 
-client = APIClient(BASE_URL)
-service = ContratosService(client)
+# TTL zero: o manifesto já decide o que recoletar, então toda resposta
+# cacheada é revalidada (ETag/Last-Modified) em vez de servida às cegas.
+# O cache serve para os 304 (corpo não baixado de novo) e para o
+# MODO_OFFLINE. Arquivo próprio (o app não espera pelo coletor) e
+# commits a cada poucos segundos, não um por resposta
+cache_http = CacheHTTP(
+    CAMINHO_CACHE_COLETA,
+    ttls={tipo: 0 for tipo in TTL_PADRAO},
+    offline=MODO_OFFLINE,
+    intervalo=2.0
+)
+
+client_async = APIClientAsync(
+    BASE_URL,
+    transporte=transporte,
+    limitador=LimitadorTaxa(REQ_POR_SEGUNDO, RAJADA),
+    concorrencia=CONCORRENCIA,
+    cache=cache_http
+)
+service_async = ContratosServiceAsync(client_async)
+
+
+def carregar_base_anterior(caminho):
+    # aceita a base anterior em qualquer formato (json/jsonl, comprimida ou não);
+    # indexada em disco: cada contrato reaproveitado é lido na hora de regravar
+    existente = localizar_base(caminho)
+    return BaseIndexada(existente) if existente else {}
 
 # ================= 1️⃣ CONTRATOS =================
 
-print("📄 Coletando lista de contratos...")
+print(f"📄 Coletando lista de contratos de {len(UGS)} UG(s)...")
 
-contratos = service.listar_por_ug(UG)
 
-if LIMITE_TESTE:
-    contratos = contratos[:LIMITE_TESTE]
+async def listar_ugs():
+    return await asyncio.gather(*[service_async.listar_por_ug(ug) for ug in UGS])
 
-with open("data/raw/contratos.json", "w", encoding="utf-8") as f:
-    json.dump(contratos, f, ensure_ascii=False, indent=2)
 
-print(f"✔ {len(contratos)} contratos salvos")
+contratos_por_ug = dict(zip(UGS, asyncio.run(listar_ugs())))
 
-# ================= 2️⃣ HISTÓRICO E EMPENHOS =================
+for ug in UGS:
+    if LIMITE_TESTE:
+        contratos_por_ug[ug] = contratos_por_ug[ug][:LIMITE_TESTE]
 
-historicos = {}
-empenhos = {}
+    salvar_json(os.path.join(dir_ug(ug), "contratos.json"), contratos_por_ug[ug])
+    print(f"✔ UG {ug}: {len(contratos_por_ug[ug])} contratos salvos")
 
-for c in contratos:
-    cid = str(c["id"])
-    print(f"🔄 Contrato {cid}")
+# ================= 2️⃣ LINKS DOS CONTRATOS =================
 
-    # -------- histórico --------
-    url_hist = c.get("links", {}).get("historico")
-    if url_hist:
-        try:
-            historicos[cid] = service.obter_link(url_hist)
-            time.sleep(DELAY)
-        except Exception as e:
-            historicos[cid] = []
-            print(f"⚠️ Histórico erro ({cid}): {e}")
-    else:
-        historicos[cid] = []
-
-    # -------- empenhos --------
-    url_emp = c.get("links", {}).get("empenhos")
-    if url_emp:
-        try:
-            empenhos[cid] = service.obter_link(url_emp)
-            time.sleep(DELAY)
-        except Exception as e:
-            empenhos[cid] = []
-            print(f"⚠️ Empenhos erro ({cid}): {e}")
+# estado da coleta de cada UG (manifesto, diário, base anterior)
+estado = {}
+
+# todas as UGs numa única coleta: um contrato em mais de uma UG é
+# buscado uma vez e registrado em cada uma delas
+pendentes = {}
+ugs_do_contrato = {}
+
+# contratos reaproveitados que só renovam os RECURSOS_SEMPRE
+renovacoes = {}
+ugs_da_renovacao = {}
+
+for ug, contratos in contratos_por_ug.items():
+    arquivos = {
+        recurso: caminho_formato(caminho, FORMATO_BASE, COMPRESSAO)
+        for recurso, caminho in arquivos_recursos(RECURSOS, diretorio=dir_ug(ug)).items()
+    }
+    meta = dir_ug(ug, DIR_META)
+
+    manifesto = ManifestoColeta(os.path.join(meta, os.path.basename(CAMINHO_MANIFESTO)))
+    jornal = JornalColeta(os.path.join(meta, os.path.basename(CAMINHO_JORNAL)))
+
+    # retomada: contratos concluídos numa execução interrompida
+    # (registros sem algum dos recursos atuais são recoletados)
+    concluidos = {
+        cid: registro
+        for cid, registro in jornal.carregar().items()
+        if all(recurso in registro["dados"] for recurso in RECURSOS)
+    }
+
+    if concluidos:
+        print(f"♻️ UG {ug}: retomando coleta interrompida ({len(concluidos)} contratos já concluídos)")
+
+    for c in contratos:
+        registro = concluidos.get(str(c["id"]))
+        if registro:
+            manifesto.registrar(
+                c,
+                registro["dados"]["historico"],
+                agora=datetime.fromisoformat(registro["coletado_em"])
+            )
+
+    # base anterior: reaproveitada no modo incremental e, em qualquer
+    # modo, mantida para os recursos cuja coleta falhar
+    anteriores = {
+        recurso: carregar_base_anterior(caminho)
+        for recurso, caminho in arquivos.items()
+    }
+
+    if MODO_INCREMENTAL:
+        pendentes_ug = [
+            c for c in contratos
+            if str(c["id"]) not in concluidos
+            and (
+                any(str(c["id"]) not in anteriores[r] for r in RECURSOS)
+                or manifesto.precisa_atualizar(c, timedelta(days=TTL_DIAS))
+            )
+        ]
     else:
-        empenhos[cid] = []
+        pendentes_ug = [c for c in contratos if str(c["id"]) not in concluidos]
+
+    ids_pendentes = {str(c["id"]) for c in pendentes_ug}
+
+    renovar_ug = [
+        c for c in contratos
+        if SEMPRE
+        and str(c["id"]) not in ids_pendentes
+        and str(c["id"]) not in concluidos
+    ]
+    ids_renovar = {str(c["id"]) for c in renovar_ug}
+
+    for lista, destino, ugs_por_id in (
+        (pendentes_ug, pendentes, ugs_do_contrato),
+        (renovar_ug, renovacoes, ugs_da_renovacao),
+    ):
+        for c in lista:
+            destino.setdefault(str(c["id"]), c)
+            ugs = ugs_por_id.setdefault(str(c["id"]), [])
+            if ug not in ugs:
+                ugs.append(ug)
+
+    def reaproveitar(cid, recurso, concluidos=concluidos, anteriores=anteriores):
+        if cid in concluidos:
+            return concluidos[cid]["dados"][recurso]
+        if cid in anteriores[recurso]:
+            return anteriores[recurso][cid]
+        # contrato novo sem cópia local: vazio, como na coleta original
+        return []
+
+    # um arquivo por recurso, gravado na ordem da lista de contratos
+    escritas = {
+        recurso: EscritaOrdenada(
+            EscritorBase(caminho),
+            [c["id"] for c in contratos],
+            ids_pendentes | (ids_renovar if recurso in SEMPRE else set()),
+            partial(reaproveitar, recurso=recurso)
+        )
+        for recurso, caminho in arquivos.items()
+    }
+
+    estado[ug] = {
+        "manifesto": manifesto,
+        "jornal": jornal,
+        "escritas": escritas,
+        "reaproveitar": reaproveitar,
+    }
+
+    print(f"🔁 UG {ug}: {len(pendentes_ug)} contratos a coletar ({len(contratos) - len(pendentes_ug)} reaproveitados, {len(renovar_ug)} só com renovação)")
+
+# coletado por completo em alguma UG: a renovação vem junto
+renovacoes = {cid: c for cid, c in renovacoes.items() if cid not in pendentes}
+
+
+def entregar(ug, cid, recurso, dados, ok):
+    # recurso que falhou mantém a cópia local em vez da lista vazia
+    estado[ug]["escritas"][recurso].entregar(
+        cid,
+        dados[recurso] if ok[recurso]
+        else estado[ug]["reaproveitar"](cid, recurso)
+    )
+
+
+def registrar_conclusao(contrato, dados, ok):
+    cid = str(contrato["id"])
+
+    for ug in ugs_do_contrato.get(cid, []):
+        # falhas não entram no diário nem no manifesto → serão recoletadas
+        if all(ok.values()):
+            estado[ug]["jornal"].registrar(cid, dados)
+            estado[ug]["manifesto"].registrar(contrato, dados["historico"])
+
+        for recurso in estado[ug]["escritas"]:
+            entregar(ug, cid, recurso, dados, ok)
+
+    # UGs em que o contrato só precisava da renovação
+    registrar_renovacao(contrato, dados, ok)
+
+
+def registrar_renovacao(contrato, dados, ok):
+    cid = str(contrato["id"])
+
+    for ug in ugs_da_renovacao.get(cid, []):
+        for recurso in SEMPRE:
+            if ok[recurso]:
+                estado[ug]["manifesto"].registrar_renovacao(cid, recurso)
+            entregar(ug, cid, recurso, dados, ok)
+
+
+async def coletar_tudo():
+    # nada fica acumulado: cada contrato vai direto para os arquivos
+    await asyncio.gather(
+        coletar_links_async(
+            list(pendentes.values()),
+            service_async,
+            recursos=RECURSOS,
+            ao_concluir=registrar_conclusao,
+            acumular=False
+        ),
+        coletar_links_async(
+            list(renovacoes.values()),
+            service_async,
+            recursos=SEMPRE,
+            ao_concluir=registrar_renovacao,
+            acumular=False
+        ),
+    )
+
+
+asyncio.run(coletar_tudo())
+client_async.fechar()
+cache_http.fechar()
+
+# ================= 3️⃣ SALVAMENTO FINAL E PARQUET =================
+
+for ug in UGS:
+    for escrita in estado[ug]["escritas"].values():
+        escrita.concluir()
+
+    estado[ug]["manifesto"].salvar()
+    estado[ug]["jornal"].encerrar()
+
+# a base anterior e o diário já foram regravados; libera antes do Parquet
+del estado
 
-# ================= 3️⃣ SALVAMENTO FINAL =================
+for ug in UGS:
+    linhas = exportar_diretorio(dir_ug(ug), dir_ug(ug, DIR_PARQUET))
+    print(f"🗂️ UG {ug}: Parquet atualizado: {linhas}")
 
-with open("data/raw/historicos.json", "w", encoding="utf-8") as f:
-    json.dump(historicos, f, ensure_ascii=False, indent=2)
+# ================= 4️⃣ BASE PROCESSADA =================
 
-with open("data/raw/empenhos.json", "w", encoding="utf-8") as f:
-    json.dump(empenhos, f, ensure_ascii=False, indent=2)
+# tabelas do painel já montadas (exercício atual e anterior) para a
+# seleção padrão do app — todas as UGs com base; o app só as lê
+ano_atual = datetime.now().year
+linhas = gerar_base_processada(ugs_disponiveis(), (ano_atual - 1, ano_atual))
+print(f"🧮 Base processada para o painel: {linhas}")
 
+print(f"📶 Requisições: {transporte.metricas.resumo()}")
 print("✅ Coleta finalizada com sucesso")
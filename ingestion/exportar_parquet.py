@@ -0,0 +1,91 @@
+import os
+
+from ingestion.recursos import ARQUIVOS_RECURSOS, DIR_RAW
+from processing.base_local import assinatura_arquivo, dir_ug, ugs_disponiveis
+from processing.indice_empenhos import (
+    ARQUIVO_INDICE,
+    IndiceEmpenhos,
+    salvar_indice_empenhos,
+)
+from processing.serializacao import ler_base, localizar_base
+from processing.tabelas import DIR_PARQUET, montar_tabelas, salvar_tabelas_parquet
+
+
+def exportar_parquet(
+    contratos,
+    historicos,
+    empenhos,
+    diretorio=DIR_PARQUET,
+    outros=None,
+    assinaturas=None
+):
+    """
+    Gera as tabelas normalizadas e tipadas em Parquet a partir da base bruta.
+    outros: {recurso: dados} dos demais links coletados (uma tabela cada).
+    assinaturas: {tabela: assinatura do arquivo bruto lido} (tabela_atual).
+    """
+    tabelas = montar_tabelas(contratos, historicos, empenhos, outros)
+    salvar_tabelas_parquet(tabelas, diretorio, assinaturas)
+    return {nome: len(df) for nome, df in tabelas.items()}
+
+
+def exportar_diretorio(origem=DIR_RAW, destino=DIR_PARQUET):
+    """
+    Converte a base JSON já coletada em `origem` para Parquet em `destino`,
+    junto com o índice de empenhos por contrato × ano (indice_empenhos).
+    """
+    def localizar(arquivo):
+        # a base pode estar em json ou jsonl, comprimida ou não
+        return localizar_base(os.path.join(origem, arquivo))
+
+    def ler(arquivo):
+        return ler_base(localizar(arquivo))
+
+    outros = {
+        recurso: ler(arquivo)
+        for recurso, arquivo in ARQUIVOS_RECURSOS.items()
+        if recurso not in ("historico", "empenhos")
+        and localizar(arquivo)
+    }
+
+    # assinaturas antes da leitura: se um arquivo mudar no meio, a tabela
+    # (e o índice) fica com carimbo antigo e a carga volta ao JSON
+    assinaturas = {
+        tabela: assinatura_arquivo(localizar(arquivo))
+        for tabela, arquivo in (
+            ("contratos", "contratos.json"),
+            ("historicos", ARQUIVOS_RECURSOS["historico"]),
+            ("empenhos", ARQUIVOS_RECURSOS["empenhos"]),
+        )
+    }
+    empenhos = ler(ARQUIVOS_RECURSOS["empenhos"])
+
+    linhas = exportar_parquet(
+        ler("contratos.json"),
+        ler(ARQUIVOS_RECURSOS["historico"]),
+        empenhos,
+        diretorio=destino,
+        outros=outros,
+        assinaturas=assinaturas
+    )
+
+    linhas["indice_empenhos"] = salvar_indice_empenhos(
+        IndiceEmpenhos.construir(empenhos),
+        os.path.join(destino, ARQUIVO_INDICE),
+        assinaturas["empenhos"],
+    )
+
+    return linhas
+
+
+if __name__ == "__main__":
+    # conversão avulsa: uma pasta por UG ou, sem partições, a base legada
+    ugs = ugs_disponiveis()
+
+    if not ugs:
+        linhas = exportar_diretorio()
+        print(f"✅ Parquet gerado em {DIR_PARQUET}: {linhas}")
+
+    for ug in ugs:
+        linhas = exportar_diretorio(dir_ug(ug), dir_ug(ug, DIR_PARQUET))
+        print(f"✅ UG {ug}: Parquet gerado em {dir_ug(ug, DIR_PARQUET)}: {linhas}")
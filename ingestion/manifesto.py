@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+CAMINHO_MANIFESTO = "data/meta/manifesto_coleta.json"
+
+
+def hash_conteudo(obj):
+    """
+    Hash estável (sha256) de um objeto JSON.
+    """
+    texto = json.dumps(obj, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def ultimo_alterado_em(historico):
+    """
+    Maior `alterado_em` entre os eventos do histórico (ou None).
+    """
+    datas = [h.get("alterado_em") for h in historico or [] if h.get("alterado_em")]
+    return max(datas) if datas else None
+
+
+class ManifestoColeta:
+    """
+    Estado local da coleta incremental, por id de contrato:
+
+        {
+            "coletado_em": "2025-01-31T02:10:00",
+            "hash": "<sha256 do item da lista de contratos>",
+            "alterado_em": "<maior alterado_em do histórico>",
+            "renovado_em": {"faturas": "2025-02-03T02:10:00"}
+        }
+
+    "renovado_em": recursos buscados de novo numa execução em que o
+    contrato não foi recoletado (RECURSOS_SEMPRE do coletor).
+    """
+
+    def __init__(self, caminho=CAMINHO_MANIFESTO):
+        self.caminho = caminho
+        self.contratos = {}
+
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                self.contratos = json.load(f).get("contratos", {})
+
+    def precisa_atualizar(self, contrato, ttl, agora=None):
+        """
+        True se o item da lista mudou desde a última coleta ou se os
+        dados locais são mais antigos que `ttl` (timedelta).
+        """
+        agora = agora or datetime.now()
+        registro = self.contratos.get(str(contrato["id"]))
+
+        if not registro:
+            return True
+
+        if registro.get("hash") != hash_conteudo(contrato):
+            return True
+
+        coletado_em = datetime.fromisoformat(registro["coletado_em"])
+        return agora - coletado_em > ttl
+
+    def registrar(self, contrato, historico, agora=None):
+        agora = agora or datetime.now()
+
+        self.contratos[str(contrato["id"])] = {
+            "coletado_em": agora.isoformat(timespec="seconds"),
+            "hash": hash_conteudo(contrato),
+            "alterado_em": ultimo_alterado_em(historico),
+        }
+
+    def registrar_renovacao(self, cid, recurso, agora=None):
+        registro = self.contratos.get(str(cid))
+        if registro is None:
+            return
+
+        agora = agora or datetime.now()
+        registro.setdefault("renovado_em", {})[recurso] = agora.isoformat(timespec="seconds")
+
+    def salvar(self):
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+
+        with open(self.caminho, "w", encoding="utf-8") as f:
+            json.dump(
+                {"contratos": self.contratos},
+                f,
+                ensure_ascii=False,
+                indent=2
+            )
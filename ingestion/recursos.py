@@ -0,0 +1,63 @@
+import os
+
+
+DIR_RAW = "data/raw"
+
+# -------------------------------------------------
+# LINKS DE CADA CONTRATO (contrato["links"])
+# -------------------------------------------------
+
+# recurso -> arquivo local (historicos/empenhos mantêm os nomes de sempre)
+ARQUIVOS_RECURSOS = {
+    "historico": "historicos.json",
+    "empenhos": "empenhos.json",
+    "faturas": "faturas.json",
+    "cronograma": "cronograma.json",
+    "itens": "itens.json",
+    "garantias": "garantias.json",
+    "prepostos": "prepostos.json",
+    "responsaveis": "responsaveis.json",
+    "despesas_acessorias": "despesas_acessorias.json",
+    "ocorrencias": "ocorrencias.json",
+    "terceirizados": "terceirizados.json",
+    "arquivos": "arquivos.json",
+}
+
+ROTULOS = {
+    "historico": "Histórico",
+    "empenhos": "Empenhos",
+    "faturas": "Faturas",
+    "cronograma": "Cronograma",
+    "itens": "Itens",
+    "garantias": "Garantias",
+    "prepostos": "Prepostos",
+    "responsaveis": "Responsáveis",
+    "despesas_acessorias": "Despesas acessórias",
+    "ocorrencias": "Ocorrências",
+    "terceirizados": "Terceirizados",
+    "arquivos": "Arquivos",
+}
+
+# o manifesto da coleta incremental decide pelo histórico
+RECURSOS_OBRIGATORIOS = ("historico",)
+
+
+def arquivos_recursos(recursos, diretorio=DIR_RAW):
+    """
+    ('empenhos', 'itens') -> {'historico': 'data/raw/historicos.json',
+                              'empenhos': ..., 'itens': ...}
+
+    Os obrigatórios entram sempre (na frente); nomes desconhecidos
+    levantam ValueError.
+    """
+    desconhecidos = [r for r in recursos if r not in ARQUIVOS_RECURSOS]
+    if desconhecidos:
+        raise ValueError(f"Recursos desconhecidos: {', '.join(desconhecidos)}")
+
+    selecionados = list(RECURSOS_OBRIGATORIOS)
+    selecionados += [r for r in recursos if r not in selecionados]
+
+    return {
+        r: os.path.join(diretorio, ARQUIVOS_RECURSOS[r])
+        for r in selecionados
+    }
@@ -1,4 +1,8 @@
-def calcular_indicadores_gerais(contratos):
+from processing.modelos import como_contrato
+from processing.prazos import dias_ate
+
+
+def calcular_indicadores_gerais(contratos, hoje=None):
     if not contratos:
         return {
             "total": 0,
@@ -10,31 +14,21 @@ def calcular_indicadores_gerais(contratos):
             "contratos_vencidos": 0
         }
 
-    def parse(v):
-        if not v:
-            return 0.0
-        return float(v.replace(".", "").replace(",", "."))
+    contratos = [como_contrato(c) for c in contratos]
 
     total = len(contratos)
-    ativos = sum(1 for c in contratos if c.get("situacao") == "Ativo")
+    ativos = sum(1 for c in contratos if c.situacao == "Ativo")
 
-    valor_global = sum(parse(c.get("valor_global")) for c in contratos)
-    valor_exec = sum(parse(c.get("valor_acumulado")) for c in contratos)
+    valor_global = sum(c.valor_global for c in contratos)
+    valor_exec = sum(c.valor_acumulado for c in contratos)
 
     exec_media = (valor_exec / valor_global) * 100 if valor_global else 0
 
-    from processing.prazos import dias_para_encerrar
-
-    vencidos = 0
-    criticos = 0
+    # NaN (sem data) não entra em nenhuma das contagens
+    dias = dias_ate([c.vigencia_fim for c in contratos], hoje)
 
-    for c in contratos:
-        dias = dias_para_encerrar(c.get("vigencia_fim"))
-        if dias is not None:
-            if dias < 0:
-                vencidos += 1
-            elif dias <= 30:
-                criticos += 1
+    vencidos = int((dias < 0).sum())
+    criticos = int(((dias >= 0) & (dias <= 30)).sum())
 
     return {
         "total": total,
@@ -0,0 +1,159 @@
+import json
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from processing.serializacao import eh_jsonl, ler_base
+
+
+# chave de primeiro nível no .json gravado com indent=2: '\n  "4388": '
+# (níveis internos têm recuo maior; quebras de linha em textos são escapadas)
+_CHAVE_JSON = re.compile(rb'\n  ("(?:[^"\\\n]|\\.)*"): ')
+
+# linha do .jsonl: '{"id": "4388", "dados": ...}'
+_CHAVE_JSONL = re.compile(rb'^\{"id": ("(?:[^"\\\n]|\\.)*"), "dados": ', re.M)
+
+
+def _indexar_json(dados):
+    """
+    {id: (inicio, fim)} do valor de cada chave de primeiro nível,
+    ou None se o arquivo não estiver no layout do json.dump(indent=2).
+    """
+    if dados[:1] != b"{":
+        return None
+
+    if dados[:16].strip() == b"{}":
+        return {}
+
+    if dados[:5] != b'{\n  "':
+        return None
+
+    # fechamento do objeto: '\n}' no fim do arquivo (ignorando espaços finais)
+    fim_objeto = dados.rfind(b"\n}")
+    if fim_objeto < 0 or dados[fim_objeto + 2:].strip():
+        return None
+
+    indice = {}
+    anterior = None
+
+    for m in _CHAVE_JSON.finditer(dados, 0, fim_objeto):
+        if anterior is not None:
+            chave, inicio = anterior
+            indice[chave] = (inicio, m.start() - 1)  # antes da vírgula
+        anterior = (json.loads(m.group(1)), m.end())
+
+    if anterior is not None:
+        chave, inicio = anterior
+        indice[chave] = (inicio, fim_objeto)
+
+    return indice
+
+
+def _indexar_jsonl(dados):
+    indice = {}
+
+    for m in _CHAVE_JSONL.finditer(dados):
+        fim_linha = dados.find(b"\n", m.end())
+        if fim_linha < 0:
+            fim_linha = len(dados)
+        indice[json.loads(m.group(1))] = (m.end(), fim_linha - 1)  # antes do '}'
+
+    return indice
+
+
+class BaseIndexada(Mapping):
+    """
+    Leitura preguiçosa da base bruta ({id_contrato: dados}).
+
+    Na abertura só indexa a posição (bytes) do valor de cada contrato;
+    o JSON de um contrato é decodificado quando pedido (get / []).
+    Serve onde hoje se usa o dicionário carregado com json.load.
+
+    O arquivo não fica aberto (o coletor pode regravá-lo a qualquer
+    momento); se mudar, o índice é refeito na próxima leitura.
+    Arquivos comprimidos ou fora do layout gravado pelo coletor caem
+    para a leitura completa em memória.
+    """
+
+    def __init__(self, caminho, tamanho_cache=32):
+        self.caminho = caminho
+        self._dados = None
+        self._indice = None
+        self._assinatura = None
+        self._lock = threading.Lock()
+        self._recentes = OrderedDict()
+        self._tamanho_cache = tamanho_cache
+
+        if not caminho.endswith((".gz", ".zst")):
+            self._indexar()
+
+        if self._indice is None:
+            self._dados = ler_base(caminho)
+
+    def _indexar(self):
+        with open(self.caminho, "rb") as f:
+            st = os.fstat(f.fileno())
+            self._assinatura = (st.st_mtime_ns, st.st_size)
+            self._recentes.clear()
+
+            if st.st_size == 0:
+                self._indice = None
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+                if eh_jsonl(self.caminho):
+                    self._indice = _indexar_jsonl(dados)
+                else:
+                    self._indice = _indexar_json(dados)
+
+    def _ler_trecho(self, chave):
+        with open(self.caminho, "rb") as f:
+            st = os.fstat(f.fileno())
+
+            if (st.st_mtime_ns, st.st_size) != self._assinatura:
+                return None
+
+            inicio, fim = self._indice[chave]
+            f.seek(inicio)
+            return f.read(fim - inicio)
+
+    def __getitem__(self, chave):
+        if self._dados is not None:
+            return self._dados[chave]
+
+        with self._lock:
+            if chave in self._recentes:
+                self._recentes.move_to_end(chave)
+                return self._recentes[chave]
+
+            trecho = self._ler_trecho(chave)
+
+            if trecho is None:
+                # arquivo regravado desde a indexação
+                self._indexar()
+                if self._indice is None:
+                    self._dados = ler_base(self.caminho)
+                    return self._dados[chave]
+                trecho = self._ler_trecho(chave)
+
+            valor = json.loads(trecho.decode("utf-8"))
+
+            self._recentes[chave] = valor
+            if len(self._recentes) > self._tamanho_cache:
+                self._recentes.popitem(last=False)
+
+        return valor
+
+    def __contains__(self, chave):
+        if self._dados is not None:
+            return chave in self._dados
+        return chave in self._indice
+
+    def __iter__(self):
+        return iter(self._dados if self._dados is not None else self._indice)
+
+    def __len__(self):
+        return len(self._dados if self._dados is not None else self._indice)
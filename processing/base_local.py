@@ -0,0 +1,400 @@
+import hashlib
+import os
+import threading
+from collections import ChainMap
+from datetime import datetime, timedelta
+
+from processing.base_indexada import BaseIndexada
+from processing.indice_empenhos import (
+    ARQUIVO_INDICE,
+    IndiceEmpenhos,
+    ler_indice_empenhos,
+)
+from processing.modelos import CAMPOS_EVENTO, como_historico, historicos_de_tabela
+from processing.serializacao import ler_base, localizar_base
+from processing.tabelas import tabela_atual
+
+
+DIR_RAW = "data/raw"
+DIR_META = "data/meta"
+DIR_PARQUET = "data/parquet"
+
+# base legada (uma única UG, direto em data/raw)
+ARQUIVOS_BASE = {
+    "contratos": "data/raw/contratos.json",
+    "empenhos": "data/raw/empenhos.json",
+    "historicos": "data/raw/historicos.json",
+}
+
+ARQUIVO_FATURAS = "data/raw/faturas.json"
+ARQUIVO_MANIFESTO = "data/meta/manifesto_coleta.json"
+
+# base particionada por unidade gestora: data/raw/ug=290002/...
+PREFIXO_UG = "ug="
+
+# faturas buscadas pelo coletor há mais que isso são buscadas de novo na
+# API (o coletor as renova em toda execução, mesmo sem recoletar o contrato)
+VALIDADE_FATURAS = timedelta(days=1)
+
+# cache do processo: compartilhado por todas as sessões do Streamlit
+_cache = {}
+_lock = threading.Lock()
+
+
+def assinatura_arquivo(caminho):
+    """
+    (mtime_ns, tamanho) do arquivo — muda sempre que o coletor regrava.
+    """
+    st = os.stat(caminho)
+    return st.st_mtime_ns, st.st_size
+
+
+def versao_base(arquivos=ARQUIVOS_BASE):
+    """
+    Identificador curto da versão atual da base em disco.
+    Serve de chave barata para caches que dependem dos dados.
+    """
+    partes = [
+        f"{nome}:{caminho}:{assinatura_arquivo(caminho)}"
+        for nome, caminho in sorted(arquivos.items())
+    ]
+    return hashlib.sha1("|".join(partes).encode()).hexdigest()[:16]
+
+
+# -------------------------------------------------
+# PARTIÇÕES POR UG
+# -------------------------------------------------
+
+def dir_ug(ug, raiz=DIR_RAW):
+    """
+    dir_ug('290002')            -> 'data/raw/ug=290002'
+    dir_ug('290002', DIR_META)  -> 'data/meta/ug=290002'
+    """
+    return os.path.join(raiz, f"{PREFIXO_UG}{ug}")
+
+
+def ugs_disponiveis(raiz=DIR_RAW):
+    """
+    UGs com base coletada (partições com contratos.json), em ordem.
+    """
+    if not os.path.isdir(raiz):
+        return []
+
+    return sorted(
+        nome[len(PREFIXO_UG):]
+        for nome in os.listdir(raiz)
+        if nome.startswith(PREFIXO_UG)
+        and os.path.exists(os.path.join(raiz, nome, "contratos.json"))
+    )
+
+
+def arquivos_ug(ug, raiz=DIR_RAW):
+    return {
+        nome: os.path.join(dir_ug(ug, raiz), os.path.basename(caminho))
+        for nome, caminho in ARQUIVOS_BASE.items()
+    }
+
+
+def _ler_json(caminho):
+    # .json, .jsonl ou comprimido — ver processing.serializacao
+    return ler_base(caminho)
+
+
+def carregar_json_cacheado(caminho):
+    """
+    Lê o JSON uma única vez por processo; relê só se o arquivo mudou.
+    """
+    assinatura = assinatura_arquivo(caminho)
+
+    with _lock:
+        atual = _cache.get(caminho)
+        if atual and atual[0] == assinatura:
+            return atual[1]
+
+        dados = _ler_json(caminho)
+        _cache[caminho] = (assinatura, dados)
+        return dados
+
+
+def carregar_indice_cacheado(caminho):
+    """
+    BaseIndexada (leitura sob demanda) única por processo; reindexa
+    só se o arquivo mudou.
+    """
+    assinatura = assinatura_arquivo(caminho)
+    chave = ("indice", caminho)
+
+    with _lock:
+        atual = _cache.get(chave)
+        if atual and atual[0] == assinatura:
+            return atual[1]
+
+        indice = BaseIndexada(caminho)
+        _cache[chave] = (assinatura, indice)
+        return indice
+
+
+def carregar_base(arquivos=ARQUIVOS_BASE, preguicoso=False):
+    """
+    Retorna (contratos, empenhos, historicos, versao).
+
+    Com preguicoso=True, empenhos e historicos vêm como BaseIndexada:
+    mesma interface de leitura do dicionário (get, [], in), mas cada
+    contrato só é decodificado quando consultado.
+
+    Os objetos são compartilhados entre sessões: tratar como somente leitura.
+    """
+    # o coletor pode ter gravado em outro formato (jsonl, .gz...)
+    arquivos = {
+        nome: localizar_base(caminho) or caminho
+        for nome, caminho in arquivos.items()
+    }
+
+    carregar = carregar_indice_cacheado if preguicoso else carregar_json_cacheado
+
+    return (
+        carregar_json_cacheado(arquivos["contratos"]),
+        carregar(arquivos["empenhos"]),
+        carregar(arquivos["historicos"]),
+        versao_base(arquivos),
+    )
+
+
+def carregar_base_ugs(ugs, raiz=DIR_RAW, preguicoso=False):
+    """
+    Mesmo retorno de carregar_base, juntando as partições das UGs pedidas.
+    Só as UGs selecionadas são lidas; sem UGs, usa a base legada.
+
+    Um contrato presente em mais de uma UG aparece uma única vez.
+    """
+    if not ugs:
+        return carregar_base(preguicoso=preguicoso)
+
+    if len(ugs) == 1:
+        return carregar_base(arquivos_ug(ugs[0], raiz), preguicoso)
+
+    partes = [carregar_base(arquivos_ug(ug, raiz), preguicoso) for ug in ugs]
+    versao = hashlib.sha1(
+        "|".join(p[3] for p in partes).encode()
+    ).hexdigest()[:16]
+
+    chave = ("ugs", tuple(ugs), raiz, preguicoso)
+
+    with _lock:
+        atual = _cache.get(chave)
+        if atual and atual[0] == versao:
+            return atual[1]
+
+    contratos, vistos = [], set()
+
+    for c_ug, _, _, _ in partes:
+        for c in c_ug:
+            if c["id"] not in vistos:
+                vistos.add(c["id"])
+                contratos.append(c)
+
+    if preguicoso:
+        # sem juntar em memória: a última UG prevalece, como no update
+        empenhos = ChainMap(*[p[1] for p in reversed(partes)])
+        historicos = ChainMap(*[p[2] for p in reversed(partes)])
+    else:
+        empenhos, historicos = {}, {}
+        for _, e_ug, h_ug, _ in partes:
+            empenhos.update(e_ug)
+            historicos.update(h_ug)
+
+    base = (contratos, empenhos, historicos, versao)
+
+    with _lock:
+        _cache[chave] = (versao, base)
+
+    return base
+
+
+def _historicos_parquet(ugs, raiz, parquet):
+    """
+    {id: [EventoHistorico]} das UGs (ou da base legada) lidos da tabela
+    tipada de históricos gravada pelo coletor; None se faltar a tabela de
+    alguma partição ou se ela não corresponder ao arquivo bruto atual.
+    """
+    if ugs:
+        particoes = [(arquivos_ug(ug, raiz), dir_ug(ug, parquet)) for ug in ugs]
+    else:
+        particoes = [(ARQUIVOS_BASE, parquet)]
+
+    modelos = {}
+
+    for arquivos, destino in particoes:
+        bruto = localizar_base(arquivos["historicos"])
+        if bruto is None:
+            return None
+
+        tabela = tabela_atual(
+            "historicos",
+            assinatura_arquivo(bruto),
+            destino,
+            ["contrato_id", *CAMPOS_EVENTO]
+        )
+        if tabela is None:
+            return None
+
+        # um contrato em mais de uma UG: a última prevalece
+        modelos.update(historicos_de_tabela(tabela))
+
+    return modelos
+
+
+def carregar_modelos(contratos, historicos, versao, ugs=None, raiz=DIR_RAW, parquet=DIR_PARQUET):
+    """
+    Históricos dos contratos já convertidos em modelos
+    (processing.modelos): {id: [EventoHistorico]}.
+
+    Convertidos uma vez por versão da base e compartilhados entre
+    sessões; a montagem da tabela de cada exercício reaproveita.
+    (Empenhos: ver carregar_indice_empenhos.)
+
+    ugs: seleção de onde vieram os históricos ([] = base legada). Se
+    informada, lê a tabela Parquet tipada do coletor quando ela for desta
+    versão da base, sem decodificar o JSON; senão, converte os dicts.
+    """
+    chave = ("modelos", versao)
+
+    with _lock:
+        atual = _cache.get(chave)
+        if atual:
+            return atual
+
+    tipados = None if ugs is None else _historicos_parquet(ugs, raiz, parquet)
+
+    if tipados is not None:
+        modelos = {str(c["id"]): tipados.get(str(c["id"]), []) for c in contratos}
+    else:
+        modelos = {
+            str(c["id"]): como_historico(historicos.get(str(c["id"])))
+            for c in contratos
+        }
+
+    with _lock:
+        # versões antigas não servem mais
+        for k in [k for k in _cache if isinstance(k, tuple) and k[0] == "modelos"]:
+            del _cache[k]
+        _cache[chave] = modelos
+
+    return modelos
+
+
+def _indice_empenhos_particao(arquivos, destino):
+    """
+    (assinatura, IndiceEmpenhos) de uma partição: o índice gravado pelo
+    coletor em `destino` se corresponder ao arquivo de empenhos atual;
+    senão, calculado aqui.
+    """
+    bruto = localizar_base(arquivos["empenhos"]) or arquivos["empenhos"]
+    assinatura = assinatura_arquivo(bruto)
+    chave = ("indice_empenhos", bruto)
+
+    with _lock:
+        atual = _cache.get(chave)
+        if atual and atual[0] == assinatura:
+            return atual
+
+    indice = ler_indice_empenhos(os.path.join(destino, ARQUIVO_INDICE), assinatura)
+
+    if indice is None:
+        indice = IndiceEmpenhos.construir(carregar_indice_cacheado(bruto))
+
+    with _lock:
+        _cache[chave] = (assinatura, indice)
+
+    return assinatura, indice
+
+
+def carregar_indice_empenhos(ugs, raiz=DIR_RAW, parquet=DIR_PARQUET):
+    """
+    IndiceEmpenhos (somas por contrato × ano) das UGs pedidas ou, sem
+    UGs, da base legada. Um contrato em mais de uma UG: a última prevalece,
+    como em carregar_base_ugs.
+    """
+    if not ugs:
+        return _indice_empenhos_particao(ARQUIVOS_BASE, parquet)[1]
+
+    partes = [
+        _indice_empenhos_particao(arquivos_ug(ug, raiz), dir_ug(ug, parquet))
+        for ug in ugs
+    ]
+
+    if len(partes) == 1:
+        return partes[0][1]
+
+    chave = ("indice_empenhos_ugs", tuple(ugs), raiz)
+    versao = tuple(assinatura for assinatura, _ in partes)
+
+    with _lock:
+        atual = _cache.get(chave)
+        if atual and atual[0] == versao:
+            return atual[1]
+
+    indice = IndiceEmpenhos.juntar(p[1] for p in partes)
+
+    with _lock:
+        _cache[chave] = (versao, indice)
+
+    return indice
+
+
+def _carregar_opcional(caminho):
+    existente = localizar_base(caminho)
+    if not existente:
+        return {}
+    return carregar_json_cacheado(existente)
+
+
+def _faturas_em(registro):
+    """
+    Última busca das faturas do contrato pelo coletor: na coleta completa
+    ou na renovação feita a cada execução (manifesto, "renovado_em").
+    """
+    datas = [registro["coletado_em"], registro.get("renovado_em", {}).get("faturas")]
+    return max(datetime.fromisoformat(d) for d in datas if d)
+
+
+def faturas_locais(contrato_id, validade=VALIDADE_FATURAS, agora=None, ugs=None):
+    """
+    Faturas do contrato pré-coletadas pelo coletor.
+
+    Retorna a lista (possivelmente vazia) se foi buscada há menos de
+    `validade`; None se não houver dado local ou se estiver
+    vencido — nesse caso o chamador deve buscar na API.
+
+    ugs: partições onde procurar (None = base legada).
+    """
+    cid = str(contrato_id)
+    agora = agora or datetime.now()
+
+    if ugs:
+        locais = [
+            (
+                os.path.join(dir_ug(ug), os.path.basename(ARQUIVO_FATURAS)),
+                os.path.join(dir_ug(ug, DIR_META), os.path.basename(ARQUIVO_MANIFESTO)),
+            )
+            for ug in ugs
+        ]
+    else:
+        locais = [(ARQUIVO_FATURAS, ARQUIVO_MANIFESTO)]
+
+    for arquivo_faturas, arquivo_manifesto in locais:
+        faturas = _carregar_opcional(arquivo_faturas)
+
+        if cid not in faturas:
+            continue
+
+        registro = _carregar_opcional(arquivo_manifesto).get("contratos", {}).get(cid)
+        if not registro:
+            continue
+
+        if agora - _faturas_em(registro) > validade:
+            continue
+
+        return faturas[cid]
+
+    return None
@@ -0,0 +1,140 @@
+import json
+import os
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from processing.base_local import (
+    DIR_RAW,
+    carregar_base_ugs,
+    carregar_indice_empenhos,
+    carregar_modelos,
+)
+from processing.visao_contratos_vetorizada import (
+    atualizar_prazos,
+    montar_tabelas_exercicios,
+)
+
+
+# -------------------------------------------------
+# BASE PROCESSADA (TABELAS PRONTAS)
+# -------------------------------------------------
+#
+# Depois da coleta, as tabelas dos exercícios (df_base, df_base_anterior)
+# são montadas uma vez e gravadas em Parquet; o app as lê direto em vez
+# de reprocessar a base bruta a cada início de processo.
+#
+# Cada arquivo leva um carimbo: versão da base bruta (versao_base das
+# UGs), exercícios do lote e dia da montagem. Só é usado se a versão
+# bater; se foi montado em dia anterior, vigência e prazo são refeitos
+# (atualizar_prazos) — o resto não depende do dia.
+
+DIR_PROCESSADO = "data/processed"
+
+
+def dir_selecao(ugs, destino=DIR_PROCESSADO):
+    """
+    Pasta das tabelas de uma seleção de UGs (a base legada fica na raiz).
+    """
+    if not ugs:
+        return destino
+    return os.path.join(destino, "ugs=" + "+".join(ugs))
+
+
+def _caminho(pasta, ano):
+    return os.path.join(pasta, f"exercicio={ano}.parquet")
+
+
+def _carimbo(versao, anos, hoje):
+    return json.dumps({
+        "versao": versao,
+        "anos": sorted(anos),
+        "gerado_em": hoje.isoformat(),
+    })
+
+
+def salvar_base_processada(tabelas, ugs, versao, hoje, destino=DIR_PROCESSADO):
+    pasta = dir_selecao(ugs, destino)
+    os.makedirs(pasta, exist_ok=True)
+
+    carimbo = _carimbo(versao, tabelas.keys(), hoje)
+
+    for ano, df in tabelas.items():
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        tabela = tabela.replace_schema_metadata({
+            **(tabela.schema.metadata or {}),
+            b"carimbo": carimbo.encode(),
+        })
+
+        caminho = _caminho(pasta, ano)
+        tmp = f"{caminho}.tmp"
+        pq.write_table(tabela, tmp, compression="zstd")
+        os.replace(tmp, caminho)
+
+
+def carregar_base_processada(ugs, versao, anos, hoje=None, destino=DIR_PROCESSADO):
+    """
+    {ano: tabela} gravado pelo coletor para estas UGs, ou None se faltar
+    algum exercício ou se a base bruta mudou desde a montagem.
+    """
+    hoje = hoje or date.today()
+    pasta = dir_selecao(ugs, destino)
+    caminhos = {ano: _caminho(pasta, ano) for ano in anos}
+
+    if not all(os.path.exists(c) for c in caminhos.values()):
+        return None
+
+    carimbos = {
+        (pq.read_schema(c).metadata or {}).get(b"carimbo")
+        for c in caminhos.values()
+    }
+
+    # todos do mesmo lote, e do lote pedido (o ajuste pelo exercício
+    # anterior depende de quais anos foram montados juntos)
+    if len(carimbos) != 1 or None in carimbos:
+        return None
+
+    carimbo = json.loads(carimbos.pop())
+
+    if carimbo["versao"] != versao or carimbo["anos"] != sorted(anos):
+        return None
+
+    gerado_em = date.fromisoformat(carimbo["gerado_em"])
+    if gerado_em > hoje:
+        return None
+
+    tabelas = {}
+
+    for ano, caminho in caminhos.items():
+        # partitioning=None: a pasta ugs=... não vira coluna
+        df = pq.read_table(caminho, partitioning=None).to_pandas()
+        if gerado_em < hoje:
+            df = atualizar_prazos(df, hoje)
+        tabelas[ano] = df
+
+    return tabelas
+
+
+def gerar_base_processada(ugs, anos, hoje=None, raiz=DIR_RAW, destino=DIR_PROCESSADO):
+    """
+    Etapa pós-coleta: monta as tabelas dos exercícios das UGs (como o
+    app faria) e grava. Retorna {ano: linhas}.
+    """
+    hoje = hoje or date.today()
+
+    contratos, _, historicos, versao = carregar_base_ugs(
+        ugs, raiz, preguicoso=True
+    )
+
+    tabelas = montar_tabelas_exercicios(
+        contratos,
+        carregar_modelos(contratos, historicos, versao, ugs, raiz),
+        carregar_indice_empenhos(ugs, raiz),
+        anos,
+        hoje
+    )
+
+    salvar_base_processada(tabelas, ugs, versao, hoje, destino)
+
+    return {ano: len(df) for ano, df in tabelas.items()}
@@ -1,6 +1,11 @@
+from bisect import bisect_left, bisect_right
 from datetime import date, datetime
 import calendar
 
+import numpy as np
+
+from processing.modelos import como_contrato, como_historico
+
 
 # -------------------------------------------------
 # UTILS
@@ -12,74 +17,166 @@ def parse_data(d):
     return datetime.fromisoformat(d).date()
 
 
-def parse_valor(v):
-    if not v:
-        return 0.0
-    return float(v.replace(".", "").replace(",", "."))
-
-
 def dias_no_mes(ano, mes):
     return calendar.monthrange(ano, mes)[1]
 
 
 def valor_periodo_proporcional(inicio, fim, valor_mensal):
-    total = 0.0
-    atual = date(inicio.year, inicio.month, 1)
+    """
+    Valor proporcional de `valor_mensal` entre `inicio` e `fim` (inclusive).
+
+    Cada mês vale `valor_mensal`, rateado pelos dias do próprio mês:
+    meses cheios entram em bloco e só as pontas são proporcionais.
+    """
+    if fim < inicio:
+        return 0.0
 
-    while atual <= fim:
-        ano = atual.year
-        mes = atual.month
-        dias_mes = dias_no_mes(ano, mes)
+    dias_mes_ini = dias_no_mes(inicio.year, inicio.month)
 
-        inicio_mes = date(ano, mes, 1)
-        fim_mes = date(ano, mes, dias_mes)
+    if (inicio.year, inicio.month) == (fim.year, fim.month):
+        return valor_mensal / dias_mes_ini * ((fim - inicio).days + 1)
 
-        ini_val = max(inicio, inicio_mes)
-        fim_val = min(fim, fim_mes)
+    # primeiro mês (do dia inicial até o fim do mês)
+    total = valor_mensal / dias_mes_ini * (dias_mes_ini - inicio.day + 1)
 
-        if ini_val <= fim_val:
-            dias_validos = (fim_val - ini_val).days + 1
-            valor_dia = valor_mensal / dias_mes
-            total += valor_dia * dias_validos
+    # meses cheios entre as pontas
+    meses_cheios = (fim.year - inicio.year) * 12 + fim.month - inicio.month - 1
+    total += meses_cheios * valor_mensal
 
-        if mes == 12:
-            atual = date(ano + 1, 1, 1)
-        else:
-            atual = date(ano, mes + 1, 1)
+    # último mês (do dia 1 até o dia final)
+    total += valor_mensal / dias_no_mes(fim.year, fim.month) * fim.day
 
     return total
 
 
+def valores_periodos_proporcionais(inicios, fins, valores_mensais):
+    """
+    Versão em lote de valor_periodo_proporcional com aritmética de datas
+    do NumPy. Recebe sequências de mesmo tamanho (date, datetime64 ou
+    texto ISO) e devolve um array float com o valor de cada período.
+    """
+    ini = np.asarray(inicios, dtype="datetime64[D]")
+    fim = np.asarray(fins, dtype="datetime64[D]")
+    valor = np.asarray(valores_mensais, dtype=float)
+
+    mes_ini = ini.astype("datetime64[M]")
+    mes_fim = fim.astype("datetime64[M]")
+
+    inicio_mes_ini = mes_ini.astype("datetime64[D]")
+    inicio_mes_fim = mes_fim.astype("datetime64[D]")
+    proximo_mes_ini = (mes_ini + 1).astype("datetime64[D]")
+
+    dias_mes_ini = (proximo_mes_ini - inicio_mes_ini).astype(int)
+    dias_mes_fim = ((mes_fim + 1).astype("datetime64[D]") - inicio_mes_fim).astype(int)
+
+    mesmo_mes = mes_ini == mes_fim
+
+    # primeiro mês (ou o período inteiro, se couber num só mês)
+    dias_primeiro = np.where(
+        mesmo_mes,
+        (fim - ini).astype(int) + 1,
+        (proximo_mes_ini - ini).astype(int)
+    )
+    total = valor / dias_mes_ini * dias_primeiro
+
+    # meses cheios + último mês
+    meses_cheios = (mes_fim - mes_ini).astype(int) - 1
+    dias_ultimo = (fim - inicio_mes_fim).astype(int) + 1
+
+    total = total + np.where(
+        mesmo_mes,
+        0.0,
+        meses_cheios * valor + valor / dias_mes_fim * dias_ultimo
+    )
+
+    return np.where(fim >= ini, total, 0.0)
+
+
 # -------------------------------------------------
-# VALOR VIGENTE ANTES DE UMA DATA
+# LINHA DO TEMPO DO VALOR MENSAL
 # -------------------------------------------------
 
-def valor_vigente_antes_da_data(contrato, historico, data_evento):
-    valor_global = parse_valor(contrato.get("valor_global"))
-    parcelas = contrato.get("num_parcelas") or 12
-    valor_mensal = valor_global / parcelas
+class LinhaDoTempoValor:
+    """
+    Valor mensal do contrato como função escada no tempo.
 
-    eventos = []
+    Montada uma única vez a partir do histórico: cada evento com
+    `data_inicio_novo_valor` e novo valor global > 0 abre um degrau
+    (novo valor mensal e número de parcelas). Consultas por data são
+    buscas binárias — O(log E) em vez de reordenar o histórico a cada vez.
 
-    for h in historico or []:
-        d = h.get("data_inicio_novo_valor")
-        if not d:
-            continue
+    Aceita os modelos de processing.modelos ou os dicionários da API.
+    """
+
+    def __init__(self, contrato, historico):
+        contrato = como_contrato(contrato)
+        parcelas = contrato.num_parcelas or 12
+
+        self.valor_inicial = contrato.valor_global / parcelas
+        self.parcelas_iniciais = parcelas
+
+        eventos = [
+            (h.data_inicio_novo_valor, h)
+            for h in como_historico(historico)
+            if h.data_inicio_novo_valor
+        ]
+
+        # ordenação estável: eventos da mesma data mantêm a ordem original
+        eventos.sort(key=lambda x: x[0])
 
-        data_ev = parse_data(d)
+        self.datas = []
+        self.valores = []
+        self.parcelas = []
 
-        if data_ev and data_ev < data_evento:
-            eventos.append((data_ev, h))
+        for data_ev, h in eventos:
+            novo_valor = h.novo_valor_global
+            if novo_valor > 0:
+                parcelas = h.novo_num_parcelas or parcelas
+                self.datas.append(data_ev)
+                self.valores.append(novo_valor / parcelas)
+                self.parcelas.append(parcelas)
 
-    eventos = sorted(eventos, key=lambda x: x[0])
+    def _degrau(self, i):
+        if i <= 0:
+            return self.valor_inicial, self.parcelas_iniciais
+        return self.valores[i - 1], self.parcelas[i - 1]
 
-    for _, h in eventos:
-        novo_valor = parse_valor(h.get("novo_valor_global"))
-        if novo_valor > 0:
-            parcelas = h.get("novo_num_parcelas") or parcelas
-            valor_mensal = novo_valor / parcelas
+    def valor_antes_de(self, data):
+        """
+        Valor mensal vigente considerando eventos anteriores a `data`.
+        """
+        return self._degrau(bisect_left(self.datas, data))[0]
+
+    def parcelas_antes_de(self, data):
+        return self._degrau(bisect_left(self.datas, data))[1]
+
+    def valor_em(self, data):
+        """
+        Valor mensal vigente em `data` (eventos do próprio dia inclusos).
+        """
+        return self._degrau(bisect_right(self.datas, data))[0]
+
+
+def valor_vigente_antes_da_data(contrato, historico, data_evento):
+    return LinhaDoTempoValor(contrato, historico).valor_antes_de(data_evento)
+
+def _eventos_com_valor(historico):
+    """
+    (data_inicio_novo_valor, data_assinatura, evento) dos eventos que
+    trazem valor novo — os demais não têm impacto financeiro.
+    """
+    for h in como_historico(historico):
+        data_ev = h.data_inicio_novo_valor
+        if not data_ev:
+            continue
+
+        # verificar se há valor novo
+        if h.novo_valor_global <= 0 and h.novo_valor_parcela <= 0:
+            # evento não altera valor → ignorar
+            continue
+
+        yield data_ev, h.data_assinatura, h
 
-    return valor_mensal
 
 def consolidar_eventos_do_ano(historico, ano):
     """
@@ -87,29 +184,28 @@ def consolidar_eventos_do_ano(historico, ano):
     Evita duplicidade e eventos sem impacto financeiro.
     """
 
-    eventos_temp = []
+    eventos_temp = [
+        ev for ev in _eventos_com_valor(historico)
+        if ev[0].year == ano
+    ]
 
-    for h in historico or []:
-        d = h.get("data_inicio_novo_valor")
-        if not d:
-            continue
+    return _consolidar(eventos_temp)
 
-        data_ev = parse_data(d)
-        if not data_ev or data_ev.year != ano:
-            continue
 
-        # verificar se há valor novo
-        novo_valor_global = parse_valor(h.get("novo_valor_global"))
-        novo_valor_parcela = parse_valor(h.get("novo_valor_parcela"))
+def consolidar_eventos_por_ano(historico):
+    """
+    {ano: eventos consolidados} numa única passada pelo histórico —
+    mesmo resultado de consolidar_eventos_do_ano para cada ano.
+    """
+    por_ano = {}
 
-        if novo_valor_global <= 0 and novo_valor_parcela <= 0:
-            # evento não altera valor → ignorar
-            continue
+    for ev in _eventos_com_valor(historico):
+        por_ano.setdefault(ev[0].year, []).append(ev)
 
-        data_ass = parse_data(h.get("data_assinatura")) if h.get("data_assinatura") else None
+    return {ano: _consolidar(eventos) for ano, eventos in por_ano.items()}
 
-        eventos_temp.append((data_ev, data_ass, h))
 
+def _consolidar(eventos_temp):
     if not eventos_temp:
         return []
 
@@ -137,19 +233,28 @@ def consolidar_eventos_do_ano(historico, ano):
 # MOTOR PRINCIPAL
 # -------------------------------------------------
 
-def calcular_valor_exercicio(contrato, historico, ano):
+def calcular_valor_exercicio(contrato, historico, ano, linha_tempo=None, eventos=None):
+    """
+    linha_tempo e eventos (consolidar_eventos_por_ano) podem vir prontos
+    quando o mesmo contrato é calculado para vários exercícios.
+    """
 
-    inicio_contrato = parse_data(contrato["vigencia_inicio"])
+    contrato = como_contrato(contrato)
+    historico = como_historico(historico)
 
-    eventos = consolidar_eventos_do_ano(historico, ano)
+    inicio_contrato = contrato.vigencia_inicio
+
+    if eventos is None:
+        eventos = consolidar_eventos_do_ano(historico, ano)
+
+    if eventos and linha_tempo is None:
+        linha_tempo = LinhaDoTempoValor(contrato, historico)
 
     # -------------------------------------------------
     # SEM ALTERAÇÃO NO ANO
     # -------------------------------------------------
     if not eventos:
-        valor_global = parse_valor(contrato.get("valor_global"))
-        parcelas = contrato.get("num_parcelas") or 12
-        valor_mensal = valor_global / parcelas
+        valor_mensal = contrato.valor_global / (contrato.num_parcelas or 12)
 
         if inicio_contrato.year == ano:
             return valor_periodo_proporcional(
@@ -169,11 +274,7 @@ def calcular_valor_exercicio(contrato, historico, ano):
 
     for data_ev, ev in eventos:
 
-        valor_mensal = valor_vigente_antes_da_data(
-            contrato,
-            historico,
-            data_ev
-        )
+        valor_mensal = linha_tempo.valor_antes_de(data_ev)
 
         mes_ev = data_ev.month
 
@@ -190,8 +291,8 @@ def calcular_valor_exercicio(contrato, historico, ano):
         # VERIFICAR SE EXISTE NOVO VALOR REAL
         # -------------------------------------------------
 
-        novo_valor_global = parse_valor(ev.get("novo_valor_global"))
-        novo_valor_parcela = parse_valor(ev.get("novo_valor_parcela"))
+        novo_valor_global = ev.novo_valor_global
+        novo_valor_parcela = ev.novo_valor_parcela
 
         # se não houver valor novo → IGNORA evento
         if novo_valor_global <= 0 and novo_valor_parcela <= 0:
@@ -202,7 +303,10 @@ def calcular_valor_exercicio(contrato, historico, ano):
 
         # definir valor novo
         if novo_valor_global > 0:
-            parcelas = ev.get("novo_num_parcelas") or parcelas
+            parcelas = (
+                ev.novo_num_parcelas
+                or linha_tempo.parcelas_antes_de(data_ev)
+            )
             valor_mensal_novo = novo_valor_global / parcelas
         else:
             valor_mensal_novo = novo_valor_parcela
@@ -240,29 +344,29 @@ def calcular_valor_exercicio(contrato, historico, ano):
 
     # meses restantes
     if mes_corrente <= 12:
-        valor_final = valor_vigente_antes_da_data(
-            contrato,
-            historico,
-            date(ano, 12, 31)
-        )
+        valor_final = linha_tempo.valor_antes_de(date(ano, 12, 31))
         total += (12 - mes_corrente + 1) * valor_final
 
     return total
 
-def calcular_valor_exercicio_debug(contrato, historico, ano):
+def calcular_valor_exercicio_debug(contrato, historico, ano, linha_tempo=None):
     logs = []
 
-    inicio_contrato = parse_data(contrato["vigencia_inicio"])
+    contrato = como_contrato(contrato)
+    historico = como_historico(historico)
+
+    inicio_contrato = contrato.vigencia_inicio
 
     eventos = consolidar_eventos_do_ano(historico, ano)
 
+    if eventos and linha_tempo is None:
+        linha_tempo = LinhaDoTempoValor(contrato, historico)
+
     # -------------------------------------------------
     # SEM ALTERAÇÃO
     # -------------------------------------------------
     if not eventos:
-        valor_global = parse_valor(contrato.get("valor_global"))
-        parcelas = contrato.get("num_parcelas") or 12
-        valor_mensal = valor_global / parcelas
+        valor_mensal = contrato.valor_global / (contrato.num_parcelas or 12)
 
         if inicio_contrato.year == ano:
             valor = valor_periodo_proporcional(
@@ -298,11 +402,7 @@ def calcular_valor_exercicio_debug(contrato, historico, ano):
 
     for data_ev, ev in eventos:
 
-        valor_mensal = valor_vigente_antes_da_data(
-            contrato,
-            historico,
-            data_ev
-        )
+        valor_mensal = linha_tempo.valor_antes_de(data_ev)
 
         mes_ev = data_ev.month
 
@@ -324,8 +424,8 @@ def calcular_valor_exercicio_debug(contrato, historico, ano):
                 # VERIFICAR SE EXISTE NOVO VALOR REAL
         # -------------------------------------------------
 
-        novo_valor_global = parse_valor(ev.get("novo_valor_global"))
-        novo_valor_parcela = parse_valor(ev.get("novo_valor_parcela"))
+        novo_valor_global = ev.novo_valor_global
+        novo_valor_parcela = ev.novo_valor_parcela
 
         # se não houver valor novo → IGNORA evento
         if novo_valor_global <= 0 and novo_valor_parcela <= 0:
@@ -336,7 +436,10 @@ def calcular_valor_exercicio_debug(contrato, historico, ano):
 
         # definir valor novo
         if novo_valor_global > 0:
-            parcelas = ev.get("novo_num_parcelas") or parcelas
+            parcelas = (
+                ev.novo_num_parcelas
+                or linha_tempo.parcelas_antes_de(data_ev)
+            )
             valor_mensal_novo = novo_valor_global / parcelas
         else:
             valor_mensal_novo = novo_valor_parcela
@@ -372,11 +475,7 @@ def calcular_valor_exercicio_debug(contrato, historico, ano):
         mes_corrente = mes_ev + 1
 
     if mes_corrente <= 12:
-        valor_final = valor_vigente_antes_da_data(
-            contrato,
-            historico,
-            date(ano, 12, 31)
-        )
+        valor_final = linha_tempo.valor_antes_de(date(ano, 12, 31))
 
         meses = 12 - mes_corrente + 1
         valor = meses * valor_final
@@ -1,10 +1,6 @@
 from datetime import datetime
 
-
-def parse_valor(valor):
-    if not valor:
-        return 0.0
-    return float(valor.replace(".", "").replace(",", "."))
+from processing.indice_empenhos import resumir_empenhos
 
 
 def ano_da_data(data_str):
@@ -15,26 +11,14 @@ def ano_da_data(data_str):
 
 def consolidar_empenhos(empenhos, ano_referencia):
     """
-    empenhos: lista de empenhos de um contrato
+    empenhos: empenhos de um contrato (lista da API / Empenho ou a
+              entrada do IndiceEmpenhos — consulta direta)
     ano_referencia: int (ex: 2025)
     """
 
-    total_empenhado = 0.0
-    total_aliquidar = 0.0
-    total_liquidado = 0.0
-    total_pago = 0.0
-
-    for e in empenhos:
-        ano = ano_da_data(e.get("data_emissao"))
-        if ano != ano_referencia:
-            continue
+    t = resumir_empenhos(empenhos).ano(ano_referencia)
 
-        total_empenhado += parse_valor(e.get("empenhado"))
-        total_aliquidar += parse_valor(e.get("aliquidar"))
-        total_liquidado += parse_valor(e.get("liquidado"))
-        total_pago += parse_valor(e.get("pago"))
-
-    return total_empenhado, total_aliquidar, total_liquidado, total_pago
+    return t.empenhado, t.aliquidar, t.liquidado, t.pago
 
 def obter_empenhos_str_por_ano(empenhos_contrato: list, ano: int) -> str:
     """
@@ -42,18 +26,5 @@ def obter_empenhos_str_por_ano(empenhos_contrato: list, ano: int) -> str:
     concatenados por ' / '.
     """
 
-    numeros = []
-
-    for e in empenhos_contrato:
-        numero = e.get("numero")
-
-        if not numero:
-            continue
-
-        # filtra pelo ano (ex: 2019NE...)
-        if not numero.startswith(str(ano)):
-            continue
-
-        numeros.append(numero)
-
-    return " / ".join(sorted(set(numeros)))
+    # filtra pelo ano do número (ex: 2019NE...), já ordenados e únicos
+    return " / ".join(resumir_empenhos(empenhos_contrato).ano(ano).notas)
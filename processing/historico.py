@@ -1,5 +1,6 @@
 from datetime import datetime
-import pandas as pd
+
+from processing.modelos import como_historico
 
 
 def _parse_data(data):
@@ -76,22 +77,19 @@ def houve_repactuacao_no_ano(
     com base em Termo de Apostilamento ou Termo Aditivo com REAJUSTE.
     """
 
-    eventos = historicos.get(str(contrato_id), [])
+    eventos = como_historico(historicos.get(str(contrato_id), []))
 
     if not eventos:
         return False
 
     for ev in eventos:
         # -------- DATA DO EVENTO --------
-        data_evento = ev.get("data_assinatura") or ev.get("data_publicacao")
+        data_evento = ev.data_assinatura or ev.data_publicacao
 
-        try:
-            if pd.to_datetime(data_evento).year != ano:
-                continue
-        except Exception:
+        if not data_evento or data_evento.year != ano:
             continue
 
-        tipo = (ev.get("tipo") or "").lower()
+        tipo = (ev.tipo or "").lower()
 
         # -------- REGRA 1: APOSTILAMENTO --------
         if "apostilamento" in tipo:
@@ -99,16 +97,3 @@ def houve_repactuacao_no_ano(
 
 
     return False
-
-
-def dias_para_encerrar(data_fim):
-    if not data_fim:
-        return None
-    
-    try:
-        data = datetime.strptime(data_fim, "%Y-%m-%d").date()
-    except:
-        return None
-
-    hoje = datetime.today().date()
-    return (data - hoje).days
\ No newline at end of file
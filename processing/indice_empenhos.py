@@ -0,0 +1,249 @@
+import os
+from dataclasses import dataclass, fields
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from processing.modelos import como_empenhos
+
+
+ARQUIVO_INDICE = "indice_empenhos.parquet"
+
+VALORES = (
+    "empenhado", "aliquidar", "liquidado", "pago",
+    "rpinscrito", "rpaliquidar", "rpliquidado", "rppago",
+)
+
+
+# -------------------------------------------------
+# ÍNDICE CONTRATO × EXERCÍCIO
+# -------------------------------------------------
+#
+# Somas de empenhos pré-calculadas por contrato e ano, para que as
+# consultas por exercício (tabela principal, aba Resumo, projeção)
+# não percorram de novo a lista bruta de empenhos.
+#
+# Cada informação segue o critério de ano que já era usado:
+#   - valores: ano da data de emissão (somar_empenhos_do_ano)
+#   - notas: prefixo do número da NE, ex. 2025NE... (obter_empenhos_str_por_ano)
+#   - posicoes: data de emissão ou, sem ela, prefixo da NE (aba Resumo)
+
+
+@dataclass(slots=True)
+class TotaisEmpenho:
+    empenhado: float = 0.0
+    aliquidar: float = 0.0
+    liquidado: float = 0.0
+    pago: float = 0.0
+    rpinscrito: float = 0.0
+    rpaliquidar: float = 0.0
+    rpliquidado: float = 0.0
+    rppago: float = 0.0
+    notas: tuple = ()
+    posicoes: tuple = ()
+
+    def somar(self, e):
+        self.empenhado += e.empenhado
+        self.aliquidar += e.aliquidar
+        self.liquidado += e.liquidado
+        self.pago += e.pago
+        self.rpinscrito += e.rpinscrito
+        self.rpaliquidar += e.rpaliquidar
+        self.rpliquidado += e.rpliquidado
+        self.rppago += e.rppago
+
+
+# ano sem empenhos (somente leitura)
+VAZIO = TotaisEmpenho()
+
+
+def _ano_da_nota(numero):
+    prefixo = (numero or "")[:4]
+    return int(prefixo) if prefixo.isdigit() else None
+
+
+class EmpenhosDoContrato(dict):
+    """
+    {ano: TotaisEmpenho} de um contrato.
+    """
+
+    def ano(self, ano):
+        return self.get(ano, VAZIO)
+
+    @classmethod
+    def de_lista(cls, empenhos):
+        anos = cls()
+        notas = {}
+        posicoes = {}
+
+        for i, e in enumerate(como_empenhos(empenhos)):
+            emissao = e.data_emissao.year if e.data_emissao else None
+            ano_nota = _ano_da_nota(e.numero)
+
+            if emissao is not None:
+                anos.setdefault(emissao, TotaisEmpenho()).somar(e)
+
+            if ano_nota is not None:
+                notas.setdefault(ano_nota, set()).add(e.numero)
+
+            ano_resumo = emissao if emissao is not None else ano_nota
+            if ano_resumo is not None:
+                posicoes.setdefault(ano_resumo, []).append(i)
+
+        for ano, numeros in notas.items():
+            anos.setdefault(ano, TotaisEmpenho()).notas = tuple(sorted(numeros))
+
+        for ano, lista in posicoes.items():
+            anos.setdefault(ano, TotaisEmpenho()).posicoes = tuple(lista)
+
+        return cls(sorted(anos.items()))
+
+
+def resumir_empenhos(empenhos):
+    """
+    Lista de empenhos de um contrato (dicts da API ou Empenho) ->
+    EmpenhosDoContrato. Se já vier resumido (do índice), passa direto.
+    """
+    if isinstance(empenhos, EmpenhosDoContrato):
+        return empenhos
+    return EmpenhosDoContrato.de_lista(empenhos)
+
+
+class IndiceEmpenhos(dict):
+    """
+    {id_contrato: EmpenhosDoContrato}. Usável onde se usa a base de
+    empenhos ({id: lista}) nas funções de processing/*.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._por_ano = None
+
+    def totais(self, contrato_id, ano):
+        resumo = self.get(str(contrato_id))
+        return resumo.ano(ano) if resumo else VAZIO
+
+    def totais_ano(self, ano):
+        """
+        Soma de todos os contratos no exercício (data de emissão).
+        """
+        if self._por_ano is None:
+            por_ano = {}
+            for resumo in self.values():
+                for a, t in resumo.items():
+                    acumulado = por_ano.setdefault(a, TotaisEmpenho())
+                    for nome in VALORES:
+                        setattr(
+                            acumulado, nome,
+                            getattr(acumulado, nome) + getattr(t, nome)
+                        )
+            self._por_ano = por_ano
+
+        return self._por_ano.get(ano, VAZIO)
+
+    @classmethod
+    def construir(cls, empenhos, ids=None):
+        """
+        empenhos: {id: lista} (dict, BaseIndexada ou modelos).
+        ids: restringe aos contratos informados.
+
+        Contratos sem empenhos ficam de fora (consulta devolve VAZIO).
+        """
+        ids = empenhos.keys() if ids is None else ids
+        indice = cls()
+
+        for cid in ids:
+            resumo = EmpenhosDoContrato.de_lista(empenhos.get(cid))
+            if resumo:
+                indice[str(cid)] = resumo
+
+        return indice
+
+    @classmethod
+    def juntar(cls, indices):
+        """
+        Une índices de várias partições; o último prevalece por contrato.
+        """
+        unido = cls()
+        for indice in indices:
+            unido.update(indice)
+        return unido
+
+
+def como_indice_empenhos(empenhos, ids=None):
+    if isinstance(empenhos, IndiceEmpenhos):
+        return empenhos
+    return IndiceEmpenhos.construir(empenhos, ids)
+
+
+# -------------------------------------------------
+# PERSISTÊNCIA (PARQUET)
+# -------------------------------------------------
+#
+# Uma linha por contrato × ano. O metadado "assinatura" guarda a
+# assinatura do arquivo bruto de empenhos de origem: se não bater,
+# o índice está desatualizado e é recalculado na carga.
+
+def _esquema():
+    colunas = [("cid", pa.string()), ("ano", pa.int32())]
+    colunas += [(nome, pa.float64()) for nome in VALORES]
+    colunas += [
+        ("notas", pa.list_(pa.string())),
+        ("posicoes", pa.list_(pa.int32())),
+    ]
+    return pa.schema(colunas)
+
+
+def salvar_indice_empenhos(indice, caminho, assinatura):
+    linhas = [
+        (cid, ano, t)
+        for cid, resumo in indice.items()
+        for ano, t in resumo.items()
+    ]
+
+    colunas = {
+        "cid": [cid for cid, _, _ in linhas],
+        "ano": [ano for _, ano, _ in linhas],
+    }
+    for nome in VALORES + ("notas", "posicoes"):
+        colunas[nome] = [getattr(t, nome) for _, _, t in linhas]
+
+    tabela = pa.table(colunas, schema=_esquema()).replace_schema_metadata(
+        {"assinatura": repr(tuple(assinatura))}
+    )
+
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    tmp = f"{caminho}.tmp"
+    pq.write_table(tabela, tmp, compression="zstd")
+    os.replace(tmp, caminho)
+
+    return len(linhas)
+
+
+def ler_indice_empenhos(caminho, assinatura):
+    """
+    IndiceEmpenhos gravado em `caminho`, ou None se ausente ou se foi
+    gerado a partir de outra versão do arquivo de empenhos.
+    """
+    if not os.path.exists(caminho):
+        return None
+
+    metadados = pq.read_schema(caminho).metadata or {}
+    if metadados.get(b"assinatura") != repr(tuple(assinatura)).encode():
+        return None
+
+    # partitioning=None: a pasta ug=... não vira coluna
+    colunas = pq.read_table(caminho, partitioning=None).to_pydict()
+    nomes = [f.name for f in fields(TotaisEmpenho)]
+
+    indice = IndiceEmpenhos()
+
+    for cid, ano, *valores, notas, posicoes in zip(
+        colunas["cid"], colunas["ano"], *(colunas[nome] for nome in nomes)
+    ):
+        resumo = indice.get(cid)
+        if resumo is None:
+            resumo = indice[cid] = EmpenhosDoContrato()
+        resumo[ano] = TotaisEmpenho(*valores, tuple(notas), tuple(posicoes))
+
+    return indice
@@ -0,0 +1,181 @@
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+
+from processing.moeda import parse_valor
+
+
+# -------------------------------------------------
+# MODELOS TIPADOS
+# -------------------------------------------------
+#
+# A API entrega tudo como dicionário aninhado, com dinheiro e datas em
+# texto. Os modelos abaixo convertem uma única vez (na carga) e são
+# aceitos pelas funções de processing/* no lugar dos dicionários.
+# Dinheiro vira float (parse_valor) e datas viram date (None se vazia
+# ou inválida).
+
+
+def _data(valor):
+    if not valor:
+        return None
+    if isinstance(valor, date):
+        return valor
+    try:
+        return datetime.fromisoformat(valor).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _inteiro(valor):
+    if valor in (None, ""):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class Contrato:
+    id: int
+    numero: str
+    categoria: str
+    situacao: str
+    fornecedor: str
+    cnpj: str
+    vigencia_inicio: date
+    vigencia_fim: date
+    valor_inicial: float
+    valor_global: float
+    valor_parcela: float
+    valor_acumulado: float
+    num_parcelas: int
+
+    @classmethod
+    def de_api(cls, c):
+        fornecedor = c.get("fornecedor") or {}
+
+        return cls(
+            id=c["id"],
+            numero=c.get("numero"),
+            categoria=c.get("categoria"),
+            situacao=c.get("situacao"),
+            fornecedor=fornecedor.get("nome"),
+            cnpj=fornecedor.get("cnpj_cpf_idgener"),
+            vigencia_inicio=_data(c.get("vigencia_inicio")),
+            vigencia_fim=_data(c.get("vigencia_fim")),
+            valor_inicial=parse_valor(c.get("valor_inicial")),
+            valor_global=parse_valor(c.get("valor_global")),
+            valor_parcela=parse_valor(c.get("valor_parcela")),
+            valor_acumulado=parse_valor(c.get("valor_acumulado")),
+            num_parcelas=_inteiro(c.get("num_parcelas")),
+        )
+
+
+@dataclass(slots=True)
+class Empenho:
+    numero: str
+    data_emissao: date
+    empenhado: float
+    aliquidar: float
+    liquidado: float
+    pago: float
+    rpinscrito: float
+    rpaliquidar: float
+    rpliquidado: float
+    rppago: float
+
+    @classmethod
+    def de_api(cls, e):
+        return cls(
+            numero=e.get("numero"),
+            data_emissao=_data(e.get("data_emissao")),
+            empenhado=parse_valor(e.get("empenhado")),
+            aliquidar=parse_valor(e.get("aliquidar")),
+            liquidado=parse_valor(e.get("liquidado")),
+            pago=parse_valor(e.get("pago")),
+            rpinscrito=parse_valor(e.get("rpinscrito")),
+            rpaliquidar=parse_valor(e.get("rpaliquidar")),
+            rpliquidado=parse_valor(e.get("rpliquidado")),
+            rppago=parse_valor(e.get("rppago")),
+        )
+
+
+@dataclass(slots=True)
+class EventoHistorico:
+    tipo: str
+    data_assinatura: date
+    data_publicacao: date
+    data_inicio_novo_valor: date
+    vigencia_inicio: date
+    vigencia_fim: date
+    novo_valor_global: float
+    novo_valor_parcela: float
+    novo_num_parcelas: int
+
+    @classmethod
+    def de_api(cls, h):
+        return cls(
+            tipo=h.get("tipo"),
+            data_assinatura=_data(h.get("data_assinatura")),
+            data_publicacao=_data(h.get("data_publicacao")),
+            data_inicio_novo_valor=_data(h.get("data_inicio_novo_valor")),
+            vigencia_inicio=_data(h.get("vigencia_inicio")),
+            vigencia_fim=_data(h.get("vigencia_fim")),
+            novo_valor_global=parse_valor(h.get("novo_valor_global")),
+            novo_valor_parcela=parse_valor(h.get("novo_valor_parcela")),
+            novo_num_parcelas=_inteiro(h.get("novo_num_parcelas")),
+        )
+
+
+# colunas da tabela de históricos usadas pelo modelo
+CAMPOS_EVENTO = tuple(f.name for f in fields(EventoHistorico))
+
+
+# -------------------------------------------------
+# NORMALIZAÇÃO DA ENTRADA
+# -------------------------------------------------
+#
+# Funções de processing/* chamam estas na entrada: modelos passam
+# direto (sem custo), dicionários da API são convertidos.
+
+def como_contrato(c):
+    return c if isinstance(c, Contrato) else Contrato.de_api(c)
+
+
+def como_empenhos(empenhos):
+    if not empenhos:
+        return []
+    if isinstance(empenhos[0], Empenho):
+        return empenhos
+    return [Empenho.de_api(e) for e in empenhos]
+
+
+def como_historico(historico):
+    if not historico:
+        return []
+    if isinstance(historico[0], EventoHistorico):
+        return historico
+    return [EventoHistorico.de_api(h) for h in historico]
+
+
+def historicos_de_tabela(tabela):
+    """
+    {id: [EventoHistorico]} a partir da tabela tipada de históricos
+    (processing.tabelas, em Arrow): valores e datas já convertidos na
+    exportação, sem reinterpretar texto.
+    """
+    colunas = tabela.to_pydict()
+    linhas = tabela.num_rows
+
+    valores = [
+        colunas.get(f.name) or [0.0 if f.type is float else None] * linhas
+        for f in fields(EventoHistorico)
+    ]
+
+    modelos = {}
+
+    for cid, *campos in zip(colunas["contrato_id"], *valores):
+        modelos.setdefault(str(cid), []).append(EventoHistorico(*campos))
+
+    return modelos
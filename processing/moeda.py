@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# -------------------------------------------------
+# CONVERSÃO DE VALORES MONETÁRIOS (PADRÃO BRASILEIRO)
+# -------------------------------------------------
+#
+# A API devolve dinheiro como texto: '1.234.567,89'.
+# Regras comuns a todas as funções deste módulo:
+#   - None, '' e NaN            -> 0.0
+#   - int / float               -> float (sem reinterpretar separadores)
+#   - texto malformado          -> 0.0
+#   - não finito ('nan', 'inf') -> 0.0
+
+_TIPOS_NUMERICOS = {
+    "integer", "floating", "decimal", "mixed-integer-float", "boolean", "empty",
+}
+
+
+def parse_valor(valor):
+    """
+    Converte um valor monetário para float.
+    Ex: '73.895,79' -> 73895.79
+    """
+    if valor is None:
+        return 0.0
+
+    if isinstance(valor, str):
+        if not valor:
+            return 0.0
+        try:
+            valor = float(valor.replace(".", "").replace(",", "."))
+        except ValueError:
+            return 0.0
+    else:
+        try:
+            valor = float(valor)
+        except (TypeError, ValueError):
+            return 0.0
+
+    return valor if math.isfinite(valor) else 0.0
+
+
+def _finitos(serie):
+    # NaN (vazio/malformado) e ±inf viram 0.0
+    return serie.where(np.isfinite(serie), 0.0)
+
+
+def _parse_texto_serie(serie):
+    texto = (
+        serie.str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    return pd.to_numeric(texto, errors="coerce")
+
+
+def parse_valor_serie(serie):
+    """
+    Versão vetorizada de parse_valor para uma Series (ou lista).
+    Mantém o índice da Series de entrada.
+    """
+    if not isinstance(serie, pd.Series):
+        serie = pd.Series(serie, dtype=object)
+
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return _finitos(serie.astype(float))
+
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+
+    if tipo == "string":
+        return _finitos(_parse_texto_serie(serie).astype(float))
+
+    if tipo in _TIPOS_NUMERICOS:
+        return _finitos(pd.to_numeric(serie, errors="coerce").astype(float))
+
+    # mistura de textos e números: caminho escalar
+    return serie.map(parse_valor).astype(float)
+
+
+def _finitos_arrow(array):
+    # nulos, NaN e ±inf viram 0.0
+    return pc.fill_null(pc.if_else(pc.is_finite(array), array, 0.0), 0.0)
+
+
+def parse_valor_arrow(array):
+    """
+    Versão vetorizada para pyarrow (Array ou ChunkedArray) -> float64.
+    """
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type) \
+            or pa.types.is_decimal(array.type):
+        return _finitos_arrow(pc.cast(array, pa.float64()))
+
+    if pa.types.is_null(array.type):
+        return pc.fill_null(pc.cast(array, pa.float64()), 0.0)
+
+    texto = pc.replace_substring(array, ".", "")
+    texto = pc.replace_substring(texto, ",", ".")
+    texto = pc.if_else(pc.equal(texto, ""), pa.scalar(None, pa.string()), texto)
+
+    try:
+        convertido = pc.cast(texto, pa.float64())
+    except pa.ArrowInvalid:
+        # texto malformado: cai para o caminho do pandas (malformado -> 0.0)
+        return pa.array(parse_valor_serie(array.to_pandas()), type=pa.float64())
+
+    return _finitos_arrow(convertido)
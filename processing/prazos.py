@@ -1,7 +1,102 @@
-from datetime import datetime
+from datetime import date, datetime
 
-def dias_para_encerrar(data_fim):
-    if not data_fim:
+import numpy as np
+import pandas as pd
+
+
+# -------------------------------------------------
+# PRAZO DE VIGÊNCIA
+# -------------------------------------------------
+#
+# Dias até o fim da vigência contados em datas (fim - hoje), com `hoje`
+# informado uma vez por quem chama: todos os contratos de uma mesma
+# tela usam a mesma referência, e dá para calcular "na data X".
+
+RISCO_INDETERMINADA = "⚫ Indeterminada"
+RISCO_SEM_DATA = "—"
+RISCO_CRITICO = "🔴 Crítico"
+RISCO_ATENCAO = "🟡 Atenção"
+RISCO_MONITORAR = "🔵 Monitorar"
+RISCO_REGULAR = "🟢 Regular"
+
+
+def _como_data(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    try:
+        return datetime.fromisoformat(valor).date()
+    except (TypeError, ValueError):
         return None
-    fim = datetime.fromisoformat(data_fim)
-    return (fim - datetime.now()).days
+
+
+def dias_para_encerrar(data_fim, hoje=None):
+    """
+    Dias até `data_fim` (texto ISO, date ou datetime); None se vazia
+    ou inválida. Negativo: já encerrado.
+    """
+    fim = _como_data(data_fim) if data_fim else None
+    if fim is None:
+        return None
+    return (fim - (hoje or date.today())).days
+
+
+def dias_ate(datas_fim, hoje=None):
+    """
+    Versão em lote de dias_para_encerrar: array float com os dias de
+    cada data (NaN se vazia ou inválida).
+    """
+    fim = pd.to_datetime(
+        pd.Series(datas_fim, dtype=object),
+        errors="coerce",
+        format="ISO8601"
+    ).dt.normalize()
+
+    return (fim - pd.Timestamp(hoje or date.today())).dt.days.to_numpy(dtype=float)
+
+
+def classificar_risco(dias, indeterminada=None):
+    """
+    Faixa de risco de cada contrato pelos dias para encerrar:
+    ≤30 Crítico, ≤60 Atenção, ≤90 Monitorar, acima Regular.
+    indeterminada: máscara dos contratos sem data de fim.
+    """
+    dias = np.asarray(dias, dtype=float)
+
+    if indeterminada is None:
+        indeterminada = np.zeros(len(dias), dtype=bool)
+
+    return np.select(
+        [
+            indeterminada,
+            np.isnan(dias),
+            dias <= 30,
+            dias <= 60,
+            dias <= 90,
+        ],
+        [
+            RISCO_INDETERMINADA,
+            RISCO_SEM_DATA,
+            RISCO_CRITICO,
+            RISCO_ATENCAO,
+            RISCO_MONITORAR,
+        ],
+        default=RISCO_REGULAR
+    )
+
+
+def prazos_vigencia(datas_fim, hoje=None):
+    """
+    (vigente, dias, risco) de cada contrato pela data de fim da vigência.
+    Sem data de fim (None): vigência indeterminada — segue vigente.
+    """
+    datas_fim = pd.Series(datas_fim, dtype=object)
+
+    indeterminada = datas_fim.isna().to_numpy()
+    dias = dias_ate(datas_fim, hoje)
+    dias[indeterminada] = np.nan
+
+    vigente = indeterminada | (dias >= 0)
+
+    return vigente, dias, classificar_risco(dias, indeterminada)
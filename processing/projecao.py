@@ -1,27 +1,18 @@
 import pandas as pd
 from datetime import datetime
 
-def parse_valor(v):
-    if not v:
-        return 0.0
-    return float(v.replace(".", "").replace(",", "."))
+from processing.indice_empenhos import como_indice_empenhos
 
 
 def projecao_ate_dezembro(empenhos_base, ano):
     hoje = datetime.now()
     mes_atual = hoje.month
 
-    total_empenhado = 0
-    total_pago = 0
+    # IndiceEmpenhos: consulta direta; base bruta: indexada aqui
+    totais = como_indice_empenhos(empenhos_base).totais_ano(ano)
 
-    for lista in empenhos_base.values():
-        for emp in lista:
-            data = emp.get("data_emissao")
-            if not data or str(ano) not in data:
-                continue
-
-            total_empenhado += parse_valor(emp.get("empenhado"))
-            total_pago += parse_valor(emp.get("pago"))
+    total_empenhado = totais.empenhado
+    total_pago = totais.pago
 
     if mes_atual == 0:
         return total_empenhado, total_pago
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+
+class RegistroContratos:
+    """
+    Índice dos contratos da base por id e por número, construído uma vez
+    por versão da base. Funções em cache recebem (chave, versao) — baratos
+    de hashear — e resolvem o contrato aqui em O(1).
+    """
+
+    def __init__(self, contratos, versao):
+        self.versao = versao
+        self._por_id = {}
+        self._por_numero = {}
+
+        for c in contratos:
+            self._por_id[str(c["id"])] = c
+            # mantém a primeira ocorrência, como a busca linear fazia
+            self._por_numero.setdefault(c.get("numero"), c)
+
+    def por_id(self, contrato_id):
+        return self._por_id.get(str(contrato_id))
+
+    def por_numero(self, numero):
+        return self._por_numero.get(numero)
+
+    def __len__(self):
+        return len(self._por_id)
+
+
+# um registro por versão da base — a versão depende das UGs selecionadas,
+# e sessões com seleções diferentes não devem derrubar o registro uma da
+# outra. Os menos usados saem quando passa do limite.
+MAX_REGISTROS = 8
+
+_registros = OrderedDict()
+_lock = threading.Lock()
+
+
+def obter_registro(contratos, versao):
+    """
+    Registro desta versão da base (construído só na primeira vez).
+    """
+    with _lock:
+        registro = _registros.get(versao)
+
+        if registro is None:
+            registro = _registros[versao] = RegistroContratos(contratos, versao)
+            while len(_registros) > MAX_REGISTROS:
+                _registros.popitem(last=False)
+        else:
+            _registros.move_to_end(versao)
+
+        return registro
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from processing.prazos import prazos_vigencia
+
+
+# -------------------------------------------------
+# CLASSIFICAÇÃO DE RISCO DE PRAZO (EM LOTE)
+# -------------------------------------------------
+#
+# Colunas de prazo e risco calculadas uma única vez sobre a tabela de
+# contratos (a base em cache do app); as páginas só filtram e agrupam.
+
+STATUS_SEM_VIGENCIA = "Sem vigência"
+STATUS_VENCIDO = "🔴 Vencido"
+STATUS_CRITICO = "🔴 Crítico"
+STATUS_ALERTA = "🟡 Alerta"
+STATUS_REGULAR = "🟢 Regular"
+
+
+def classificar_status_prazo(dias):
+    """
+    Status de prazo da agenda de gestão para cada contrato:
+    vencido, ≤30 crítico, ≤60 alerta; sem data, "Sem vigência".
+    """
+    dias = np.asarray(dias, dtype=float)
+
+    return np.select(
+        [
+            np.isnan(dias),
+            dias < 0,
+            dias <= 30,
+            dias <= 60,
+        ],
+        [
+            STATUS_SEM_VIGENCIA,
+            STATUS_VENCIDO,
+            STATUS_CRITICO,
+            STATUS_ALERTA,
+        ],
+        default=STATUS_REGULAR
+    )
+
+
+def classificar_riscos(df, hoje=None, coluna_fim="Vigência fim"):
+    """
+    Acrescenta à tabela de contratos, em lote:
+
+    - "Dias para encerrar" e "Risco Vigência" (se ainda não houver —
+      a tabela dos exercícios já vem com elas)
+    - "Status Prazo" (classificar_status_prazo)
+    - "Ano", "Mês" e "Trimestre" (T1..T4) do fim da vigência
+
+    Devolve a própria tabela.
+    """
+    if df.empty:
+        return df
+
+    if "Dias para encerrar" not in df.columns:
+        _, dias, risco = prazos_vigencia(df[coluna_fim], hoje)
+        df["Dias para encerrar"] = dias
+        df["Risco Vigência"] = risco
+
+    df["Status Prazo"] = classificar_status_prazo(df["Dias para encerrar"])
+
+    fim = pd.to_datetime(df[coluna_fim], errors="coerce", format="ISO8601")
+
+    df["Ano"] = fim.dt.year.astype("Int64")
+    df["Mês"] = fim.dt.month.astype("Int64")
+    df["Trimestre"] = ("T" + fim.dt.quarter.astype("Int64").astype(str)).where(
+        fim.notna()
+    )
+
+    return df
@@ -0,0 +1,169 @@
+import gzip
+import json
+import os
+
+try:
+    import zstandard
+except ImportError:  # compressão zstd é opcional
+    zstandard = None
+
+
+# -------------------------------------------------
+# FORMATOS DA BASE BRUTA ({id_contrato: dados})
+# -------------------------------------------------
+#
+#   .json   objeto único, idêntico a json.dump(..., indent=2)
+#   .jsonl  uma linha por contrato: {"id": "4388", "dados": [...]}
+#
+# Qualquer um dos dois pode ter sufixo .gz ou .zst (compressão).
+
+EXTENSOES = (".json", ".jsonl", ".json.gz", ".jsonl.gz", ".json.zst", ".jsonl.zst")
+
+
+def _sem_compressao(caminho):
+    for sufixo in (".gz", ".zst"):
+        if caminho.endswith(sufixo):
+            return caminho[: -len(sufixo)]
+    return caminho
+
+
+def eh_jsonl(caminho):
+    return _sem_compressao(caminho).endswith(".jsonl")
+
+
+def caminho_formato(caminho, formato="json", compressao=None):
+    """
+    caminho_formato('data/raw/empenhos.json', 'jsonl', 'gzip')
+        -> 'data/raw/empenhos.jsonl.gz'
+    """
+    base = os.path.splitext(_sem_compressao(caminho))[0]
+    sufixo = {None: "", "gzip": ".gz", "zstd": ".zst"}[compressao]
+    return f"{base}.{formato}{sufixo}"
+
+
+def _variantes(caminho):
+    """
+    A base `caminho` em cada um dos formatos (ele incluso).
+    """
+    base = os.path.splitext(_sem_compressao(caminho))[0]
+    return list(dict.fromkeys([caminho] + [base + extensao for extensao in EXTENSOES]))
+
+
+def localizar_base(caminho):
+    """
+    Caminho existente para a base `caminho` em qualquer formato; havendo
+    mais de um (troca de formato numa árvore antiga), o gravado por
+    último. None se não houver nenhum.
+    """
+    existentes = [c for c in _variantes(caminho) if os.path.exists(c)]
+
+    if not existentes:
+        return None
+
+    return max(existentes, key=os.path.getmtime)
+
+
+def abrir_texto(caminho, modo="r", extensao_de=None):
+    """
+    open() em texto UTF-8, descomprimindo/comprimindo conforme a extensão
+    (de `extensao_de`, se informado — útil para arquivos temporários).
+    """
+    referencia = extensao_de or caminho
+
+    if referencia.endswith(".gz"):
+        return gzip.open(caminho, modo + "t", encoding="utf-8")
+
+    if referencia.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("Compressão zstd requer o pacote 'zstandard'")
+        return zstandard.open(caminho, modo + "t", encoding="utf-8")
+
+    return open(caminho, modo, encoding="utf-8")
+
+
+def ler_base(caminho):
+    """
+    Lê a base inteira ({id: dados}) em qualquer dos formatos.
+    """
+    with abrir_texto(caminho) as f:
+        if not eh_jsonl(caminho):
+            return json.load(f)
+
+        base = {}
+        for linha in f:
+            if linha.strip():
+                registro = json.loads(linha)
+                base[registro["id"]] = registro["dados"]
+        return base
+
+
+# -------------------------------------------------
+# ESCRITA INCREMENTAL
+# -------------------------------------------------
+
+class EscritorBase:
+    """
+    Grava a base um contrato por vez, sem montar o dicionário inteiro.
+
+        with EscritorBase("data/raw/empenhos.json") as escritor:
+            for cid, dados in ...:
+                escritor.escrever(cid, dados)
+
+    A escrita é atômica: vai para um temporário que só substitui o
+    arquivo final ao fechar sem erro. No formato .json o resultado é
+    byte a byte igual a json.dump(base, f, ensure_ascii=False, indent=2).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.jsonl = eh_jsonl(caminho)
+        self.escritos = 0
+
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self._tmp = f"{caminho}.tmp"
+        self._arquivo = abrir_texto(self._tmp, "w", extensao_de=caminho)
+
+        if not self.jsonl:
+            self._arquivo.write("{")
+
+    def escrever(self, cid, dados):
+        if self.jsonl:
+            linha = json.dumps({"id": str(cid), "dados": dados}, ensure_ascii=False)
+            self._arquivo.write(linha + "\n")
+        else:
+            # mesmo recuo que json.dump(indent=2) daria ao valor aninhado
+            valor = json.dumps(dados, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            chave = json.dumps(str(cid), ensure_ascii=False)
+            separador = "," if self.escritos else ""
+            self._arquivo.write(f"{separador}\n  {chave}: {valor}")
+
+        self.escritos += 1
+
+    def fechar(self):
+        if not self.jsonl:
+            self._arquivo.write("\n}" if self.escritos else "}")
+
+        self._arquivo.close()
+        os.replace(self._tmp, self.caminho)
+
+        # a base em outro formato ficou velha: quem lê não deve achá-la
+        for antigo in _variantes(self.caminho):
+            if antigo != self.caminho and os.path.exists(antigo):
+                os.remove(antigo)
+
+    def descartar(self):
+        self._arquivo.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        if tipo is None:
+            self.fechar()
+        else:
+            self.descartar()
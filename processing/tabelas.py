@@ -0,0 +1,233 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from processing.moeda import parse_valor_serie
+
+
+DIR_PARQUET = "data/parquet"
+
+# -------------------------------------------------
+# ESQUEMA
+# -------------------------------------------------
+
+COLUNAS_MOEDA = {
+    "contratos": [
+        "valor_inicial", "valor_global", "valor_parcela", "valor_acumulado",
+    ],
+    "empenhos": [
+        "empenhado", "aliquidar", "liquidado", "pago",
+        "rpinscrito", "rpaliquidar", "rpliquidado", "rppago",
+    ],
+    "historicos": [
+        "valor_inicial", "valor_global", "valor_parcela",
+        "novo_valor_global", "novo_valor_parcela", "retroativo_valor",
+    ],
+    "faturas": [
+        "valor", "juros", "multa", "glosa", "valorliquido",
+    ],
+    "cronograma": [
+        "valor",
+    ],
+    "itens": [
+        "valorunitario", "valortotal",
+    ],
+}
+
+COLUNAS_DATA = {
+    "contratos": [
+        "data_assinatura", "data_publicacao", "data_proposta_comercial",
+        "vigencia_inicio", "vigencia_fim",
+    ],
+    "empenhos": [
+        "data_emissao",
+    ],
+    "historicos": [
+        "data_assinatura", "data_publicacao", "data_proposta_comercial",
+        "vigencia_inicio", "vigencia_fim", "data_inicio_novo_valor",
+    ],
+    "faturas": [
+        "emissao", "prazo", "vencimento", "ateste", "dataliquidacao",
+    ],
+    "cronograma": [
+        "vencimento",
+    ],
+    "itens": [
+        "data_inicio",
+    ],
+}
+
+COLUNAS_INTEIRAS = {
+    "contratos": ["num_parcelas"],
+    "empenhos": [],
+    "historicos": ["num_parcelas", "novo_num_parcelas"],
+}
+
+
+def _achatar(registros):
+    """
+    Achata dicionários aninhados (fornecedor, links, contratante...)
+    em colunas `pai_filho`. Listas viram texto JSON.
+    """
+    if not registros:
+        return pd.DataFrame()
+
+    df = pd.json_normalize(registros, sep="_")
+
+    for col in df.columns:
+        if df[col].map(lambda v: isinstance(v, list)).any():
+            df[col] = df[col].map(
+                lambda v: json.dumps(v, ensure_ascii=False) if v is not None else None
+            )
+
+    return df
+
+
+def _tipar(df, nome):
+    # recursos sem esquema declarado ficam como vieram da API
+    for col in COLUNAS_MOEDA.get(nome, []):
+        if col in df.columns:
+            df[col] = parse_valor_serie(df[col])
+
+    for col in COLUNAS_INTEIRAS.get(nome, []):
+        if col in df.columns:
+            df[col] = df[col].astype("Int64")
+
+    for col in COLUNAS_DATA.get(nome, []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="%Y-%m-%d")
+
+    return df
+
+
+def _por_contrato(base):
+    """
+    {id_contrato: [registros]} -> lista plana com a coluna contrato_id.
+    """
+    registros = []
+
+    for cid, lista in base.items():
+        for item in lista or []:
+            registros.append({**item, "contrato_id": int(cid)})
+
+    return registros
+
+
+# -------------------------------------------------
+# NORMALIZAÇÃO (JSON BRUTO -> TABELAS)
+# -------------------------------------------------
+
+def tabela_contratos(contratos):
+    return _tipar(_achatar(contratos), "contratos")
+
+
+def tabela_empenhos(empenhos):
+    return _tipar(_achatar(_por_contrato(empenhos)), "empenhos")
+
+
+def tabela_historicos(historicos):
+    return _tipar(_achatar(_por_contrato(historicos)), "historicos")
+
+
+def tabela_recurso(dados, nome):
+    """
+    Tabela de qualquer outro link coletado (faturas, cronograma, itens...).
+    """
+    return _tipar(_achatar(_por_contrato(dados)), nome)
+
+
+def montar_tabelas(contratos, historicos, empenhos, outros=None):
+    """
+    outros: {recurso: {id_contrato: [registros]}} com os demais links.
+    """
+    tabelas = {
+        "contratos": tabela_contratos(contratos),
+        "empenhos": tabela_empenhos(empenhos),
+        "historicos": tabela_historicos(historicos),
+    }
+
+    for nome, dados in (outros or {}).items():
+        tabelas[nome] = tabela_recurso(dados, nome)
+
+    return tabelas
+
+
+# -------------------------------------------------
+# PARQUET
+# -------------------------------------------------
+
+def _para_arrow(df, nome):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+
+    # datas como date32 (sem horário)
+    for col in COLUNAS_DATA.get(nome, []):
+        if col in tabela.column_names:
+            i = tabela.column_names.index(col)
+            tabela = tabela.set_column(
+                i, col, pc.cast(tabela.column(col), pa.date32())
+            )
+
+    return tabela
+
+
+def _caminho_tabela(nome, diretorio):
+    return os.path.join(diretorio, f"{nome}.parquet")
+
+
+def salvar_tabelas_parquet(tabelas, diretorio=DIR_PARQUET, assinaturas=None):
+    """
+    assinaturas: {nome: assinatura do arquivo bruto de origem}, gravada
+    nos metadados; tabela_atual só devolve a tabela se ela bater.
+    """
+    assinaturas = assinaturas or {}
+    os.makedirs(diretorio, exist_ok=True)
+
+    for nome, df in tabelas.items():
+        tabela = _para_arrow(df, nome)
+
+        if nome in assinaturas:
+            tabela = tabela.replace_schema_metadata({
+                **(tabela.schema.metadata or {}),
+                b"assinatura": repr(tuple(assinaturas[nome])).encode(),
+            })
+
+        caminho = _caminho_tabela(nome, diretorio)
+        tmp = f"{caminho}.tmp"
+        pq.write_table(tabela, tmp, compression="zstd")
+        os.replace(tmp, caminho)
+
+
+def ler_tabela_arrow(nome, diretorio=DIR_PARQUET, colunas=None):
+    # partitioning=None: em data/parquet/ug=..., a pasta não vira coluna
+    return pq.read_table(
+        _caminho_tabela(nome, diretorio),
+        columns=colunas,
+        partitioning=None
+    )
+
+
+def tabela_atual(nome, assinatura, diretorio=DIR_PARQUET, colunas=None):
+    """
+    Tabela `nome` (Arrow) se foi gerada a partir desta versão do arquivo
+    bruto (assinatura_arquivo); None se ausente ou desatualizada.
+
+    colunas: só as necessárias (as que não existirem na tabela são
+    ignoradas).
+    """
+    caminho = _caminho_tabela(nome, diretorio)
+
+    if not os.path.exists(caminho):
+        return None
+
+    esquema = pq.read_schema(caminho)
+    if (esquema.metadata or {}).get(b"assinatura") != repr(tuple(assinatura)).encode():
+        return None
+
+    if colunas is not None:
+        colunas = [c for c in colunas if c in esquema.names]
+
+    return ler_tabela_arrow(nome, diretorio, colunas)
@@ -1,15 +1,14 @@
+import numpy as np
 import pandas as pd
 from datetime import date
 
 from processing.calculo_exercicio import calcular_valor_exercicio
 from processing.calculo_exercicio import parse_data
-from processing.historico import houve_repactuacao_no_ano, dias_para_encerrar
+from processing.historico import houve_repactuacao_no_ano
 from processing.financeiro import obter_empenhos_str_por_ano
-
-def parse_valor(v):
-    if not v:
-        return 0.0
-    return float(v.replace(".", "").replace(",", "."))
+from processing.indice_empenhos import resumir_empenhos
+from processing.moeda import parse_valor
+from processing.prazos import prazos_vigencia
 
 
 # -------------------------------------------------
@@ -17,44 +16,41 @@ def parse_valor(v):
 # -------------------------------------------------
 
 def somar_empenhos_do_ano(empenhos, ano):
-    total_empenhado = 0
-    total_pago = 0
-    total_liquidado = 0
-    total_aliquidar = 0
-
-    for emp in empenhos or []:
-        data = emp.get("data_emissao")
-        if not data:
-            continue
-
-        if str(ano) not in data:
-            continue
-
-        total_empenhado += parse_valor(emp.get("empenhado"))
-        total_pago += parse_valor(emp.get("pago"))
-        total_liquidado += parse_valor(emp.get("liquidado"))
-        total_aliquidar += parse_valor(emp.get("aliquidar"))
+    t = resumir_empenhos(empenhos).ano(ano)
 
     return (
-        total_empenhado,
-        total_pago + total_liquidado,
-        total_aliquidar
+        t.empenhado,
+        t.pago + t.liquidado,
+        t.aliquidar
     )
 
-def moeda_para_float(valor):
-    """
-    Converte string monetária brasileira para float.
-    Ex: '73.895,79' -> 73895.79
+# -------------------------------------------------
+# AJUSTE PELO EXERCÍCIO ANTERIOR
+# -------------------------------------------------
+
+def indices_exercicio_anterior(df_base_anterior):
     """
-    if valor is None:
-        return 0.0
+    Índice de execução do ano anterior por contrato:
+    Liquidado + Pago / Valor exercício, limitado entre 0,6 e 1,2.
 
-    if isinstance(valor, (int, float)):
-        return float(valor)
+    Retorna Series indexada por "Contrato" (primeira ocorrência de cada
+    número), apenas com contratos cujo Valor exercício anterior é > 0.
+    """
+    if df_base_anterior is None or df_base_anterior.empty:
+        return pd.Series(dtype=float)
 
-    return float(
-        valor.replace(".", "").replace(",", ".")
+    anterior = (
+        df_base_anterior[["Contrato", "Valor exercício", "Liquidado + Pago"]]
+        .drop_duplicates("Contrato")
+        .set_index("Contrato")
     )
+    anterior = anterior[anterior["Valor exercício"] > 0]
+
+    indice = anterior["Liquidado + Pago"] / anterior["Valor exercício"]
+
+    # limitar distorção extrema
+    return indice.clip(lower=0.6, upper=1.2)
+
 
 # -------------------------------------------------
 # TABELA PRINCIPAL
@@ -71,29 +67,30 @@ def montar_tabela_contratos(
 
     hoje = date.today()
 
+    # um único passe sobre a base anterior → busca O(1) por contrato
+    indices_anteriores = indices_exercicio_anterior(df_base_anterior).to_dict()
+
     for c in contratos:
 
         vigencia_fim_raw = c.get("vigencia_fim")
         vigencia_fim = parse_data(vigencia_fim_raw)
 
-        vigencia_indeterminada = False
+        # Caso 1 — Vigência indeterminada (null): mantém
+        if vigencia_fim_raw is not None:
 
-        # Caso 1 — Vigência indeterminada (null)
-        if vigencia_fim_raw is None:
-            vigencia_indeterminada = True
+            # Caso 2 — Vigência com data válida mas já vencida
+            if vigencia_fim and vigencia_fim < hoje:
+                continue  # contrato vencido → exclui
 
-        # Caso 2 — Vigência com data válida mas já vencida
-        elif vigencia_fim and vigencia_fim < hoje:
-            continue  # contrato vencido → exclui
-
-        # Caso 3 — Data inválida inesperada
-        elif not vigencia_fim:
-            continue
+            # Caso 3 — Data inválida inesperada
+            if not vigencia_fim:
+                continue
 
         cid = str(c["id"])
 
         historico = historicos.get(cid, [])
-        empenho = empenhos.get(cid, [])
+        # resumido por ano uma vez (direto se empenhos for IndiceEmpenhos)
+        empenho = resumir_empenhos(empenhos.get(cid, []))
 
         valor_exercicio = calcular_valor_exercicio(
             c,
@@ -109,30 +106,12 @@ def montar_tabela_contratos(
 
         valor_exercicio_ajustado = valor_exercicio_teorico
 
-        if df_base_anterior is not None:
-
-            contrato_num = c["numero"]
-
-            linha_anterior = df_base_anterior[
-                df_base_anterior["Contrato"] == contrato_num
-            ]
-
-            if not linha_anterior.empty:
-
-                valor_ex_ant = linha_anterior.iloc[0]["Valor exercício"]
-                pago_ant = linha_anterior.iloc[0]["Liquidado + Pago"]
-
-                if valor_ex_ant > 0:
-                    indice = pago_ant / valor_ex_ant
-
-                    # limitar distorção extrema
-                    indice = max(0.6, min(indice, 1.2))
-
-                    valor_exercicio_ajustado = (
-                        valor_exercicio_teorico * indice
-                    )
-
+        indice = indices_anteriores.get(c["numero"])
 
+        if indice is not None:
+            valor_exercicio_ajustado = (
+                valor_exercicio_teorico * indice
+            )
 
         repactuado = houve_repactuacao_no_ano(
             contrato_id=c["id"],
@@ -146,26 +125,9 @@ def montar_tabela_contratos(
             ano
         )
 
-        valor_parcela_float = moeda_para_float(c.get("valor_parcela"))
+        valor_parcela_float = parse_valor(c.get("valor_parcela"))
         valor_anual = valor_parcela_float * 12
 
-        if vigencia_indeterminada:
-            dias_encerrar = None
-            risco_vigencia = "⚫ Indeterminada"
-        else:
-            dias_encerrar = dias_para_encerrar(c.get("vigencia_fim"))
-
-            if dias_encerrar is None:
-                risco_vigencia = "—"
-            elif dias_encerrar <= 30:
-                risco_vigencia = "🔴 Crítico"
-            elif dias_encerrar <= 60:
-                risco_vigencia = "🟡 Atenção"
-            elif dias_encerrar <= 90:
-                risco_vigencia = "🔵 Monitorar"
-            else:
-                risco_vigencia = "🟢 Regular"
-
 
         empenhado, pago_liq, aliquidar = somar_empenhos_do_ano(
             empenho,
@@ -211,11 +173,17 @@ def montar_tabela_contratos(
             "Anulavel": saldo_anulavel,
             "Diferenca": diferenca,
             "Situação": situacao_orcamentaria,
-            "Dias para encerrar": dias_encerrar,
-            "Risco Vigência": risco_vigencia,
+            # preenchidos em lote abaixo (mesmo `hoje` para todos)
+            "Dias para encerrar": None,
+            "Risco Vigência": None,
             "Repactuação/Reajuste": "Sim" if repactuado else "Não",
         })
 
     df = pd.DataFrame(linhas)
 
+    if not df.empty:
+        _, dias, risco = prazos_vigencia(df["Vigência fim"], hoje)
+        df["Dias para encerrar"] = dias if np.isnan(dias).any() else dias.astype(int)
+        df["Risco Vigência"] = risco
+
     return df
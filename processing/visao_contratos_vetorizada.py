@@ -0,0 +1,362 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from processing.calculo_exercicio import (
+    LinhaDoTempoValor,
+    calcular_valor_exercicio,
+    consolidar_eventos_por_ano,
+)
+from processing.indice_empenhos import como_indice_empenhos
+from processing.modelos import como_contrato, como_historico
+from processing.moeda import parse_valor_serie
+from processing.prazos import prazos_vigencia
+from processing.visao_contratos import indices_exercicio_anterior
+
+
+COLUNAS_SAIDA = [
+    "ID",
+    "Contrato",
+    "Categoria",
+    "Objeto",
+    "Processo",
+    "Fornecedor",
+    "Cnpj",
+    "Vigência inicio",
+    "Vigência fim",
+    "Valor global",
+    "modalidade",
+    "valor_parcela",
+    "Valor anual",
+    "Nota(s) de empenho",
+    "Valor exercício",
+    "Empenhado",
+    "Liquidado + Pago",
+    "A liquidar",
+    "Reforco",
+    "Anulavel",
+    "Diferenca",
+    "Situação",
+    "Dias para encerrar",
+    "Risco Vigência",
+    "Repactuação/Reajuste",
+]
+
+
+# -------------------------------------------------
+# EXPLOSÃO EM TABELAS PLANAS
+# -------------------------------------------------
+
+def _frame_contratos(contratos):
+    return pd.DataFrame(
+        [
+            (
+                c["id"],
+                c.get("numero"),
+                c.get("categoria"),
+                c.get("objeto"),
+                c.get("processo"),
+                (c.get("fornecedor") or {}).get("nome"),
+                (c.get("fornecedor") or {}).get("cnpj_cpf_idgener"),
+                c.get("vigencia_inicio"),
+                c.get("vigencia_fim"),
+                c.get("valor_global"),
+                c.get("modalidade"),
+                c.get("valor_parcela"),
+            )
+            for c in contratos
+        ],
+        columns=[
+            "ID", "Contrato", "Categoria", "Objeto", "Processo",
+            "Fornecedor", "Cnpj", "Vigência inicio", "Vigência fim",
+            "Valor global", "modalidade", "valor_parcela",
+        ],
+    )
+
+
+def _ano_evento(h):
+    data = h.data_assinatura or h.data_publicacao
+    return data.year if data else None
+
+
+def _frame_historicos(historicos, ids):
+    """
+    historicos: {id: [EventoHistorico]}.
+    """
+    return pd.DataFrame(
+        [
+            (cid, _ano_evento(h), h.tipo)
+            for cid in ids
+            for h in historicos[cid]
+        ],
+        columns=["cid", "ano", "tipo"],
+    )
+
+
+# -------------------------------------------------
+# AGREGAÇÕES POR CONTRATO
+# -------------------------------------------------
+
+def _somar_empenhos(indice, ids, ano):
+    """
+    Empenhado, Liquidado + Pago, A liquidar e Nota(s) de empenho do ano,
+    por contrato — consulta ao IndiceEmpenhos (mesmos critérios de
+    somar_empenhos_do_ano e obter_empenhos_str_por_ano).
+    """
+    totais = [indice.totais(cid, ano) for cid in ids]
+
+    return pd.DataFrame({
+        "Empenhado": [float(t.empenhado) for t in totais],
+        "Liquidado + Pago": [float(t.pago + t.liquidado) for t in totais],
+        "A liquidar": [float(t.aliquidar) for t in totais],
+        "Nota(s) de empenho": [" / ".join(t.notas) or "—" for t in totais],
+    })
+
+
+def _repactuados(df_hist, ano):
+    """
+    Contratos com Termo de Apostilamento no ano (houve_repactuacao_no_ano).
+    """
+    anos = df_hist["ano"]
+    apostilamento = df_hist["tipo"].fillna("").str.lower().str.contains(
+        "apostilamento", regex=False
+    )
+    return set(df_hist.loc[(anos == ano) & apostilamento, "cid"])
+
+
+# -------------------------------------------------
+# VIGÊNCIA E PRAZO (DEPENDEM DO DIA)
+# -------------------------------------------------
+
+def _preencher_prazos(df, dias, risco):
+    df["Dias para encerrar"] = dias if np.isnan(dias).any() else dias.astype(int)
+    df["Risco Vigência"] = risco
+
+
+def atualizar_prazos(tabela, hoje=None):
+    """
+    Tabela montada em outro dia (ex.: base processada pelo coletor):
+    refaz o filtro de vigência e as colunas de prazo para `hoje`.
+    Os valores do exercício não dependem do dia e são mantidos.
+    """
+    if tabela.empty:
+        return tabela
+
+    vigente, dias, risco = prazos_vigencia(tabela["Vigência fim"], hoje)
+
+    tabela = tabela.loc[vigente].reset_index(drop=True)
+    _preencher_prazos(tabela, dias[vigente], risco[vigente])
+
+    return tabela
+
+
+# -------------------------------------------------
+# PARTES COMUNS A TODOS OS EXERCÍCIOS
+# -------------------------------------------------
+
+class _LoteContratos:
+    """
+    O que não depende do exercício, preparado uma única vez: filtro de
+    vigência, prazo/risco, modelos dos contratos e históricos, linhas do
+    tempo de valor, eventos consolidados por ano e índice de empenhos.
+    Cada exercício (tabela) só faz o cálculo do próprio ano.
+    """
+
+    def __init__(self, contratos, historicos, empenhos, hoje):
+        df = _frame_contratos(contratos)
+        self.df = None
+
+        if df.empty:
+            return
+
+        # -----------------------------
+        # FILTRO DE VIGÊNCIA E PRAZO
+        # -----------------------------
+        vigente, dias, risco = prazos_vigencia(df["Vigência fim"], hoje)
+
+        manter = np.flatnonzero(vigente)
+        df = df.iloc[manter].reset_index(drop=True)
+
+        if df.empty:
+            return
+
+        ids = [str(i) for i in df["ID"]]
+        df["cid"] = ids
+
+        # -----------------------------
+        # CONTRATOS, HISTÓRICO E EMPENHOS
+        # -----------------------------
+        # uma leitura/conversão por contrato (sem custo se já forem modelos)
+        self.contratos = [como_contrato(contratos[i]) for i in manter]
+        historicos = {cid: como_historico(historicos.get(cid)) for cid in ids}
+
+        self.eventos = [
+            consolidar_eventos_por_ano(historicos[cid]) for cid in ids
+        ]
+        self.linhas_tempo = [
+            LinhaDoTempoValor(c, historicos[cid]) if eventos else None
+            for c, cid, eventos in zip(self.contratos, ids, self.eventos)
+        ]
+        self.historicos = [historicos[cid] for cid in ids]
+
+        self.indice_empenhos = como_indice_empenhos(empenhos, ids)
+        self.df_hist = _frame_historicos(historicos, ids)
+
+        df["Valor anual"] = parse_valor_serie(df["valor_parcela"]) * 12
+        _preencher_prazos(df, dias[manter], risco[manter])
+
+        self.ids = ids
+        self.df = df
+
+    @property
+    def vazio(self):
+        return self.df is None
+
+    def valor_exercicio(self, ano):
+        """
+        Valor do exercício de cada contrato, sem o ajuste pelo ano anterior.
+        """
+        return np.array([
+            calcular_valor_exercicio(
+                c, h, ano,
+                linha_tempo=linha,
+                eventos=eventos.get(ano, [])
+            )
+            for c, h, linha, eventos in zip(
+                self.contratos, self.historicos,
+                self.linhas_tempo, self.eventos
+            )
+        ], dtype=float)
+
+    def tabela(self, ano, df_base_anterior=None, valor_exercicio=None, somas=None):
+        df = self.df.copy()
+
+        if valor_exercicio is None:
+            valor_exercicio = self.valor_exercicio(ano)
+
+        if somas is None:
+            somas = _somar_empenhos(self.indice_empenhos, self.ids, ano)
+
+        # ajuste pelo exercício anterior: um único join pelo número do contrato
+        indice = (
+            indices_exercicio_anterior(df_base_anterior)
+            .reindex(df["Contrato"])
+            .to_numpy(dtype=float)
+        )
+        valor_exercicio = np.where(
+            np.isnan(indice),
+            valor_exercicio,
+            valor_exercicio * indice
+        )
+
+        repactuados = _repactuados(self.df_hist, ano)
+
+        # -----------------------------
+        # SITUAÇÃO ORÇAMENTÁRIA
+        # -----------------------------
+        empenhado = somas["Empenhado"].to_numpy()
+        diferenca = valor_exercicio - empenhado
+
+        reforcar = diferenca > 1
+        anular = diferenca < -1
+
+        df["Nota(s) de empenho"] = somas["Nota(s) de empenho"].to_numpy()
+        df["Valor exercício"] = valor_exercicio
+        df["Empenhado"] = empenhado
+        df["Liquidado + Pago"] = somas["Liquidado + Pago"].to_numpy()
+        df["A liquidar"] = somas["A liquidar"].to_numpy()
+        df["Reforco"] = np.where(reforcar, diferenca, 0)
+        df["Anulavel"] = np.where(anular, np.abs(diferenca), 0)
+        df["Diferenca"] = diferenca
+        df["Situação"] = np.select(
+            [reforcar, anular],
+            ["🔴 Reforçar", "🟢 Anular"],
+            default="⚪ OK"
+        )
+        df["Repactuação/Reajuste"] = np.where(
+            df["cid"].isin(repactuados), "Sim", "Não"
+        )
+
+        return df[COLUNAS_SAIDA]
+
+
+# -------------------------------------------------
+# TABELA PRINCIPAL (COLUNAR)
+# -------------------------------------------------
+
+def montar_tabela_contratos_vetorizada(
+    contratos,
+    historicos,
+    empenhos,
+    ano,
+    df_base_anterior=None,
+    hoje=None
+):
+    """
+    Versão colunar de montar_tabela_contratos: mesmo resultado, mas
+    empenhos e históricos são explodidos uma única vez em tabelas planas
+    e as agregações/classificações são feitas em lote.
+
+    historicos: {id: lista} com dicts da API ou, de preferência, já
+    convertidos em modelos (base_local.carregar_modelos).
+    empenhos: {id: lista} ou, de preferência, o IndiceEmpenhos
+    (base_local.carregar_indice_empenhos) — somas por ano prontas.
+    """
+    lote = _LoteContratos(contratos, historicos, empenhos, hoje or date.today())
+
+    if lote.vazio:
+        return pd.DataFrame()
+
+    return lote.tabela(ano, df_base_anterior)
+
+
+# -------------------------------------------------
+# VÁRIOS EXERCÍCIOS (LOTE)
+# -------------------------------------------------
+
+def montar_tabelas_exercicios(
+    contratos,
+    historicos,
+    empenhos,
+    anos,
+    hoje=None
+):
+    """
+    {ano: tabela} para vários exercícios de uma vez (ex.: últimos cinco
+    anos), preparando contratos, históricos, linhas do tempo e empenhos
+    uma única vez para todos.
+
+    Cada exercício é ajustado pelo anterior sem ajuste, como a tela faz
+    hoje com df_base_anterior; o exercício mais antigo do lote sai sem
+    ajuste. Assim, anos=[a - 1, a] devolve as mesmas duas tabelas de
+
+        ant = montar_tabela_contratos_vetorizada(..., a - 1)
+        atual = montar_tabela_contratos_vetorizada(..., a, ant)
+    """
+    anos = sorted(set(anos))
+    lote = _LoteContratos(contratos, historicos, empenhos, hoje or date.today())
+
+    if lote.vazio:
+        return {ano: pd.DataFrame() for ano in anos}
+
+    tabelas = {}
+    base_sem_ajuste = {}
+
+    for ano in anos:
+        valor_exercicio = lote.valor_exercicio(ano)
+        somas = _somar_empenhos(lote.indice_empenhos, lote.ids, ano)
+
+        anterior = base_sem_ajuste.get(ano - 1)
+
+        tabelas[ano] = lote.tabela(
+            ano, anterior, valor_exercicio=valor_exercicio, somas=somas
+        )
+
+        # só o necessário para o ajuste do exercício seguinte
+        base_sem_ajuste[ano] = pd.DataFrame({
+            "Contrato": lote.df["Contrato"],
+            "Valor exercício": valor_exercicio,
+            "Liquidado + Pago": somas["Liquidado + Pago"].to_numpy(),
+        })
+
+    return tabelas
@@ -1,9 +1,13 @@
-import requests
+from services.transporte import ErroAPI, transporte_compartilhado
 
 class APIClient:
-    def __init__(self, base_url, timeout=40):
+    def __init__(self, base_url, timeout=40, transporte=None, cache=None):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # pool de conexões + retentativas; por padrão, o do processo
+        self.transporte = transporte or transporte_compartilhado()
+        # CacheHTTP opcional (respostas persistidas + revalidação)
+        self.cache = cache
 
     def get(self, endpoint):
         if endpoint.startswith("http"):
@@ -11,6 +15,36 @@ class APIClient:
         else:
             url = f"{self.base_url}{endpoint}"
 
-        resp = requests.get(url, timeout=self.timeout)
-        resp.raise_for_status()
-        return resp.json()
+        if self.cache is None:
+            resp = self.transporte.get(url, timeout=self.timeout)
+            return resp.json()
+
+        return self._get_com_cache(url)
+
+    def _get_com_cache(self, url):
+        cacheada = self.cache.obter(url)
+
+        if cacheada and (self.cache.offline or self.cache.fresca(cacheada)):
+            return cacheada.dados()
+
+        if self.cache.offline:
+            raise ErroAPI(f"Modo offline: {url} não está em cache", url=url)
+
+        resp = self.transporte.get(
+            url,
+            timeout=self.timeout,
+            headers=self.cache.cabecalhos_condicionais(cacheada)
+        )
+
+        if resp.status_code == 304 and cacheada:
+            self.cache.renovar(url)
+            return cacheada.dados()
+
+        dados = resp.json()
+        self.cache.salvar(
+            url,
+            resp.text,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified")
+        )
+        return dados
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from services.api_client import APIClient
+
+
+class APIClientAsync:
+    """
+    Contraparte assíncrona do APIClient.
+
+    Usa o mesmo Transporte (pool de conexões, retentativas, métricas) e,
+    opcionalmente, um LimitadorTaxa e um CacheHTTP compartilhados. `concorrencia` limita
+    as requisições em voo; cada uma roda num executor próprio e limitado,
+    sem bloquear o event loop.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        timeout=40,
+        transporte=None,
+        limitador=None,
+        concorrencia=8,
+        cache=None
+    ):
+        self._cliente = APIClient(
+            base_url,
+            timeout=timeout,
+            transporte=transporte,
+            cache=cache
+        )
+        self.base_url = self._cliente.base_url
+        self.transporte = self._cliente.transporte
+        self.limitador = limitador
+        self.concorrencia = concorrencia
+
+        self._executor = ThreadPoolExecutor(max_workers=concorrencia)
+        self._semaforo = None
+        self._loop = None
+
+    def _semaforo_do_loop(self):
+        # semáforos asyncio ficam presos ao loop em que foram usados
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+        return self._semaforo
+
+    async def get(self, endpoint):
+        async with self._semaforo_do_loop():
+            if self.limitador:
+                await self.limitador.aguardar()
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._cliente.get, endpoint
+            )
+
+    def fechar(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+
+CAMINHO_CACHE = "data/meta/cache_http.sqlite"
+
+# arquivo próprio do coletor: suas gravações em série não disputam o
+# lock de escrita do SQLite com o app
+CAMINHO_CACHE_COLETA = "data/meta/cache_http_coleta.sqlite"
+
+# validade (segundos) por tipo de endpoint — último trecho da URL
+TTL_PADRAO = {
+    "ug": 3600,                  # lista de contratos da UG
+    "historico": 6 * 3600,
+    "empenhos": 6 * 3600,
+    "faturas": 3600,
+    "cronograma": 24 * 3600,
+    "itens": 24 * 3600,
+    "garantias": 24 * 3600,
+    "prepostos": 24 * 3600,
+    "responsaveis": 24 * 3600,
+    "despesas_acessorias": 24 * 3600,
+    "ocorrencias": 6 * 3600,
+    "terceirizados": 24 * 3600,
+    "arquivos": 24 * 3600,
+}
+TTL_OUTROS = 3600
+
+
+def tipo_endpoint(url):
+    """
+    '.../contrato/4388/historico' -> 'historico'
+    '.../contrato/ug/290002'      -> 'ug'
+    """
+    partes = [p for p in urlparse(url).path.split("/") if p]
+
+    while partes and partes[-1].isdigit():
+        partes.pop()
+
+    return partes[-1] if partes else ""
+
+
+class RespostaCacheada:
+    __slots__ = ("url", "corpo", "etag", "last_modified", "armazenado_em")
+
+    def __init__(self, url, corpo, etag, last_modified, armazenado_em):
+        self.url = url
+        self.corpo = corpo
+        self.etag = etag
+        self.last_modified = last_modified
+        self.armazenado_em = armazenado_em
+
+    def dados(self):
+        return json.loads(self.corpo)
+
+
+class CacheHTTP:
+    """
+    Cache persistente de respostas da API (SQLite), chaveado pela URL.
+
+    - respostas dentro do TTL do tipo de endpoint são servidas sem rede;
+    - vencidas, são revalidadas com If-None-Match / If-Modified-Since
+      (304 renova a validade sem baixar o corpo de novo);
+    - offline=True serve apenas o que estiver em cache, vencido ou não.
+
+    intervalo: segundos que as gravações podem esperar pelo commit (o
+    coletor grava milhares de respostas seguidas; o app, com 0, grava
+    cada uma na hora). fechar() grava o resto.
+
+    O cache é um atalho: se o SQLite estiver ocupado, a gravação é
+    descartada com um aviso e quem chamou segue com os dados obtidos.
+    """
+
+    def __init__(self, caminho=CAMINHO_CACHE, ttls=None, offline=False, intervalo=0.0):
+        self.caminho = caminho
+        self.ttls = {**TTL_PADRAO, **(ttls or {})}
+        self.offline = offline
+        self.intervalo = intervalo
+        self._aberto_desde = None
+
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS respostas (
+                url TEXT PRIMARY KEY,
+                corpo TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                armazenado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conexao.commit()
+
+    def ttl(self, url):
+        return self.ttls.get(tipo_endpoint(url), TTL_OUTROS)
+
+    def obter(self, url):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT url, corpo, etag, last_modified, armazenado_em "
+                "FROM respostas WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        return RespostaCacheada(*linha) if linha else None
+
+    def fresca(self, resposta, agora=None):
+        agora = agora or time.time()
+        return agora - resposta.armazenado_em <= self.ttl(resposta.url)
+
+    def cabecalhos_condicionais(self, resposta):
+        cabecalhos = {}
+
+        if resposta is None:
+            return cabecalhos
+
+        if resposta.etag:
+            cabecalhos["If-None-Match"] = resposta.etag
+        if resposta.last_modified:
+            cabecalhos["If-Modified-Since"] = resposta.last_modified
+
+        return cabecalhos
+
+    def salvar(self, url, corpo, etag=None, last_modified=None):
+        self._gravar(
+            url,
+            "INSERT OR REPLACE INTO respostas "
+            "(url, corpo, etag, last_modified, armazenado_em) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, corpo, etag, last_modified, time.time())
+        )
+
+    def renovar(self, url):
+        """
+        Servidor respondeu 304: conteúdo continua válido por mais um TTL.
+        """
+        self._gravar(
+            url,
+            "UPDATE respostas SET armazenado_em = ? WHERE url = ?",
+            (time.time(), url)
+        )
+
+    def _gravar(self, url, sql, parametros):
+        with self._lock:
+            try:
+                self._conexao.execute(sql, parametros)
+
+                agora = time.monotonic()
+                if self._aberto_desde is None:
+                    self._aberto_desde = agora
+
+                # a transação não fica aberta mais que `intervalo`
+                if agora - self._aberto_desde >= self.intervalo:
+                    self._conexao.commit()
+                    self._aberto_desde = None
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Cache HTTP não gravado ({url}): {e}")
+
+    def fechar(self):
+        with self._lock:
+            try:
+                self._conexao.commit()
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Cache HTTP: gravações pendentes perdidas: {e}")
+            self._conexao.close()
@@ -0,0 +1,30 @@
+import asyncio
+
+from services.api_client_async import APIClientAsync
+
+
+class ContratosServiceAsync:
+    def __init__(self, client: APIClientAsync):
+        self.client = client
+
+    async def listar_por_ug(self, ug: str):
+        return await self.client.get(f"/contrato/ug/{ug}")
+
+    async def obter_link(self, url: str):
+        return await self.client.get(url)
+
+    async def obter_link_api(self, url_completa: str):
+        endpoint = url_completa.replace(self.client.base_url, "")
+        return await self.client.get(endpoint)
+
+    async def obter_links(self, urls, tolerar_falhas=False):
+        """
+        Busca vários links em paralelo, na ordem recebida.
+
+        Com tolerar_falhas=True, cada falha vem como a própria exceção
+        na posição correspondente, em vez de interromper o lote.
+        """
+        return await asyncio.gather(
+            *[self.obter_link(url) for url in urls],
+            return_exceptions=tolerar_falhas
+        )
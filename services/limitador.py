@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+
+class LimitadorTaxa:
+    """
+    Token bucket global para chamadas assíncronas.
+
+    Libera no máximo `taxa` requisições por segundo, permitindo
+    rajadas de até `capacidade` requisições seguidas.
+    """
+
+    def __init__(self, taxa, capacidade=1):
+        if taxa <= 0:
+            raise ValueError("taxa deve ser positiva")
+
+        self.taxa = taxa
+        self.capacidade = max(1, capacidade)
+        self._tokens = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _lock_do_loop(self):
+        # o lock asyncio fica preso ao loop em que foi usado
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._tokens = min(
+            self.capacidade,
+            self._tokens + (agora - self._ultimo) * self.taxa
+        )
+        self._ultimo = agora
+
+    async def aguardar(self):
+        """
+        Bloqueia até haver um token disponível e o consome.
+        """
+        async with self._lock_do_loop():
+            while True:
+                self._repor()
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.taxa)
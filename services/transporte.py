@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+class ErroAPI(Exception):
+    """
+    Falha definitiva numa chamada à API (após esgotar as retentativas).
+    """
+
+    def __init__(self, mensagem, url=None, status=None):
+        super().__init__(mensagem)
+        self.url = url
+        self.status = status
+
+
+class MetricasTransporte:
+    """
+    Contadores e tempos por requisição (thread-safe).
+    Guarda as últimas `limite` chamadas para inspeção.
+    """
+
+    def __init__(self, limite=1000):
+        self._lock = threading.Lock()
+        self.requisicoes = 0
+        self.retentativas = 0
+        self.falhas = 0
+        self.tempo_total = 0.0
+        self.chamadas = deque(maxlen=limite)
+
+    def registrar(self, url, status, segundos, tentativa):
+        with self._lock:
+            self.requisicoes += 1
+            self.tempo_total += segundos
+            if tentativa > 0:
+                self.retentativas += 1
+            self.chamadas.append({
+                "url": url,
+                "status": status,
+                "segundos": segundos,
+                "tentativa": tentativa,
+            })
+
+    def registrar_falha(self):
+        with self._lock:
+            self.falhas += 1
+
+    def resumo(self):
+        with self._lock:
+            return {
+                "requisicoes": self.requisicoes,
+                "retentativas": self.retentativas,
+                "falhas": self.falhas,
+                "tempo_total": round(self.tempo_total, 3),
+                "tempo_medio": (
+                    round(self.tempo_total / self.requisicoes, 3)
+                    if self.requisicoes else 0.0
+                ),
+            }
+
+
+def _retry_after(resposta):
+    """
+    Segundos indicados no cabeçalho Retry-After (número ou data HTTP).
+    """
+    valor = resposta.headers.get("Retry-After") if resposta is not None else None
+
+    if not valor:
+        return None
+
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+
+class Transporte:
+    """
+    Camada HTTP compartilhada: sessão com pool de conexões (keep-alive),
+    retentativas com backoff exponencial + jitter em 429/5xx e erros de
+    rede, respeitando Retry-After, e métricas por requisição.
+
+    Retry-After é cumprido por inteiro; se pedir mais que `espera_max`
+    segundos, a requisição falha (ErroAPI) em vez de esperar ou de
+    voltar antes da hora.
+    """
+
+    def __init__(
+        self,
+        tamanho_pool=10,
+        tentativas=4,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        espera_max=120.0,
+        timeout=40
+    ):
+        self.tentativas = tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.espera_max = espera_max
+        self.timeout = timeout
+        self.metricas = MetricasTransporte()
+
+        self.sessao = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=tamanho_pool
+        )
+        self.sessao.mount("https://", adapter)
+        self.sessao.mount("http://", adapter)
+
+    def _espera(self, tentativa, resposta=None):
+        """
+        Segundos até a próxima tentativa; None se o servidor pediu
+        (Retry-After) mais que espera_max.
+        """
+        pedido = _retry_after(resposta)
+        if pedido is not None:
+            return pedido if pedido <= self.espera_max else None
+
+        # full jitter: uniforme entre 0 e o teto exponencial
+        teto = min(self.backoff_max, self.backoff_base * (2 ** tentativa))
+        return random.uniform(0, teto)
+
+    def get(self, url, timeout=None, headers=None):
+        """
+        GET com retentativas. Retorna a resposta (status < 400 ou 304)
+        ou levanta ErroAPI.
+        """
+        timeout = timeout or self.timeout
+
+        for tentativa in range(self.tentativas + 1):
+            ultima = tentativa == self.tentativas
+            inicio = time.perf_counter()
+
+            try:
+                resposta = self.sessao.get(url, timeout=timeout, headers=headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.metricas.registrar(url, None, time.perf_counter() - inicio, tentativa)
+                if ultima:
+                    self.metricas.registrar_falha()
+                    raise ErroAPI(f"Falha de rede em {url}: {e}", url=url) from e
+                time.sleep(self._espera(tentativa))
+                continue
+
+            self.metricas.registrar(
+                url, resposta.status_code, time.perf_counter() - inicio, tentativa
+            )
+
+            if resposta.status_code in STATUS_RETENTAVEIS and not ultima:
+                espera = self._espera(tentativa, resposta)
+
+                if espera is None:
+                    self.metricas.registrar_falha()
+                    raise ErroAPI(
+                        f"HTTP {resposta.status_code} em {url}: Retry-After de "
+                        f"{_retry_after(resposta):.0f}s acima do limite ({self.espera_max:.0f}s)",
+                        url=url,
+                        status=resposta.status_code
+                    )
+
+                time.sleep(espera)
+                continue
+
+            if resposta.status_code >= 400:
+                self.metricas.registrar_falha()
+                raise ErroAPI(
+                    f"HTTP {resposta.status_code} em {url}",
+                    url=url,
+                    status=resposta.status_code
+                )
+
+            return resposta
+
+
+_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def transporte_compartilhado():
+    """
+    Transporte único do processo, reaproveitado por todos os APIClient
+    criados sem um transporte explícito.
+    """
+    global _padrao
+
+    with _lock_padrao:
+        if _padrao is None:
+            _padrao = Transporte()
+        return _padrao
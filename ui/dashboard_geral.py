@@ -1,39 +1,66 @@
 import streamlit as st
 import pandas as pd
+from datetime import date
 from processing.prazos import dias_para_encerrar
+from processing.moeda import parse_valor_serie
+from processing.riscos import classificar_riscos
 
 
 # =========================================================
 # REGRAS DE NEGÓCIO (gestão contratual)
 # =========================================================
 
-def contrato_ativo_vigente(c):
+def contrato_ativo_vigente(c, hoje=None):
     if c.get("situacao") != "Ativo":
         return False
 
-    dias = dias_para_encerrar(c.get("vigencia_fim"))
+    dias = dias_para_encerrar(c.get("vigencia_fim"), hoje)
     if dias is None:
         return True  # regra conservadora
 
     return dias >= 0
 
 
-def classificar_status_prazo(dias):
-    if dias is None:
-        return "Sem vigência"
-    if dias < 0:
-        return "🔴 Vencido"
-    if dias <= 30:
-        return "🔴 Crítico"
-    if dias <= 60:
-        return "🟡 Alerta"
-    return "🟢 Regular"
+# =========================================================
+# PREPARAÇÃO (EM LOTE)
+# =========================================================
+
+def preparar_dashboard(contratos, hoje=None):
+    """
+    Tabela do dashboard com prazo, status e vigência calculados por
+    coluna (processing.riscos), com uma única data de referência.
+    """
+    df = pd.DataFrame(
+        [
+            (
+                c["id"],
+                c["numero"],
+                c["fornecedor"]["nome"],
+                c.get("categoria"),
+                c.get("situacao"),
+                c.get("vigencia_fim"),
+                c.get("valor_global"),
+            )
+            for c in contratos
+        ],
+        columns=[
+            "ID", "Contrato", "Fornecedor", "Categoria", "Situação",
+            "Vigência fim", "Valor Global",
+        ],
+    )
 
+    df["Valor Global"] = parse_valor_serie(df["Valor Global"])
+
+    classificar_riscos(df, hoje)
+
+    df["Dias"] = df["Dias para encerrar"].astype("Int64")
+
+    # Ativo e não encerrado (sem data: regra conservadora)
+    df["Ativo Vigente"] = (
+        (df["Situação"] == "Ativo") & ~(df["Dias para encerrar"] < 0)
+    )
 
-def parse_valor(v):
-    if not v:
-        return 0.0
-    return float(v.replace(".", "").replace(",", "."))
+    return df
 
 
 # =========================================================
@@ -47,24 +74,7 @@ def render_dashboard(contratos):
     # =====================================================
     # PREPARAÇÃO DOS DADOS
     # =====================================================
-    dados = []
-
-    for c in contratos:
-        dias = dias_para_encerrar(c.get("vigencia_fim"))
-
-        dados.append({
-            "ID": c["id"],
-            "Contrato": c["numero"],
-            "Fornecedor": c["fornecedor"]["nome"],
-            "Categoria": c.get("categoria"),
-            "Situação": c.get("situacao"),
-            "Dias": dias,
-            "Status Prazo": classificar_status_prazo(dias),
-            "Valor Global": parse_valor(c.get("valor_global")),
-            "Ativo Vigente": contrato_ativo_vigente(c)
-        })
-
-    df = pd.DataFrame(dados)
+    df = preparar_dashboard(contratos, date.today())
 
     # =====================================================
     # BLOCO 1 — KPIs DE GESTÃO (PANORAMA)